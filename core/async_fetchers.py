@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步并发数据获取引擎
+在单个事件循环中并发获取多只股票、多个数据源的数据
+复用同步获取器的解析逻辑，返回类型与同步版本一致
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .http_transport import HttpTransport
+    from .kline_data_fetcher import KlineDataFetcher
+    from .minute_data_fetcher import MinuteDataFetcher
+    from .realtime_data_fetcher import RealtimeDataFetcher
+    from .financial_data_fetcher import FinancialDataFetcher
+except ImportError:
+    from http_transport import HttpTransport
+    from kline_data_fetcher import KlineDataFetcher
+    from minute_data_fetcher import MinuteDataFetcher
+    from realtime_data_fetcher import RealtimeDataFetcher
+    from financial_data_fetcher import FinancialDataFetcher
+
+
+class AsyncFetchEngine:
+    """
+    异步获取引擎
+    请求在共享连接池的线程池中执行，每个主机使用独立的信号量限制并发数
+    """
+
+    def __init__(self, max_workers: int = 32, per_host_limit: int = 8,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 transport: Optional[HttpTransport] = None):
+        """
+        max_workers: 执行请求的线程总数
+        per_host_limit: 每个主机的默认最大并发请求数
+        host_limits: 按主机覆盖的并发上限
+        transport: 共享的HTTP传输层，连接池大小应不小于单主机并发数
+        """
+        self.per_host_limit = per_host_limit
+        self.host_limits = host_limits or {}
+        max_host_limit = max([per_host_limit] + list(self.host_limits.values()))
+        self.transport = transport or HttpTransport(pool_maxsize=max_host_limit)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # 按事件循环分别保存各主机的信号量
+        self._semaphores: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        # 信号量绑定创建时的事件循环，同一引擎被多次 asyncio.run 使用时不能跨循环复用，因此按当前循环按需初始化
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            # 遇到新的事件循环时丢弃已关闭循环的信号量
+            self._semaphores = {old: sems for old, sems in self._semaphores.items() if not old.is_closed()}
+            semaphores = self._semaphores[loop] = {}
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, self.per_host_limit))
+        return semaphores[host]
+
+    async def run(self, host: str, func: Callable, *args):
+        """在主机并发限制内执行一次同步获取函数"""
+        async with self._semaphore(host):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    def close(self):
+        """关闭线程池和连接池"""
+        self.executor.shutdown(wait=False)
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _AsyncFetcherBase:
+    def __init__(self, engine: Optional[AsyncFetchEngine] = None):
+        self.engine = engine or AsyncFetchEngine()
+
+    async def _fetch_auto(self, sources: List[Tuple[str, str, Callable]], *args):
+        """按顺序尝试数据源，返回第一个有效结果"""
+        for source_name, host, source_func in sources:
+            result = await self.engine.run(host, source_func, *args)
+            if self._is_valid(result):
+                return result
+        print(f"❌ 所有数据源都无法获取数据: {args[0]}")
+        return None
+
+    async def _fetch_many(self, fetch: Callable, stock_codes: List[str], *args) -> Dict:
+        """并发获取多只股票，返回以股票代码为键的结果字典"""
+        codes = list(dict.fromkeys(stock_codes))
+        results = await asyncio.gather(*(fetch(code, *args) for code in codes))
+        return dict(zip(codes, results))
+
+    @staticmethod
+    def _is_valid(result) -> bool:
+        if isinstance(result, pd.DataFrame):
+            return not result.empty
+        return result is not None
+
+
+class AsyncKlineDataFetcher(_AsyncFetcherBase):
+    """KlineDataFetcher 的异步版本"""
+
+    def __init__(self, engine: Optional[AsyncFetchEngine] = None):
+        super().__init__(engine)
+        self.fetcher = KlineDataFetcher(transport=self.engine.transport)
+        self.sources = {
+            'sina': ('新浪财经', 'money.finance.sina.com.cn', self.fetcher.get_sina_kline_data),
+            'eastmoney': ('东方财富', 'push2his.eastmoney.com', self.fetcher.get_eastmoney_kline_data),
+            'yahoo': ('Yahoo Finance', 'query1.finance.yahoo.com', self.fetcher.get_yahoo_kline_data),
+        }
+
+    async def get_kline_data(self, stock_code: str, days: int = 90,
+                             data_source: str = 'auto') -> Optional[pd.DataFrame]:
+        """
+        异步获取K线数据
+        data_source: 'sina', 'eastmoney', 'yahoo', 'auto'
+        """
+        if data_source == 'auto':
+            return await self._fetch_auto(list(self.sources.values()), stock_code, days)
+        if data_source not in self.sources:
+            print(f"❌ 不支持的数据源: {data_source}")
+            return None
+        _, host, source_func = self.sources[data_source]
+        return await self.engine.run(host, source_func, stock_code, days)
+
+    async def get_kline_data_batch(self, stock_codes: List[str], days: int = 90,
+                                   data_source: str = 'auto') -> Dict[str, Optional[pd.DataFrame]]:
+        """并发获取多只股票的K线数据"""
+        return await self._fetch_many(self.get_kline_data, stock_codes, days, data_source)
+
+
+class AsyncMinuteDataFetcher(_AsyncFetcherBase):
+    """MinuteDataFetcher 的异步版本"""
+
+    def __init__(self, engine: Optional[AsyncFetchEngine] = None):
+        super().__init__(engine)
+        self.fetcher = MinuteDataFetcher(transport=self.engine.transport)
+        self.sources = {
+            'sina': ('新浪财经', 'money.finance.sina.com.cn', self.fetcher.get_sina_minute_data),
+            'eastmoney': ('东方财富', 'push2his.eastmoney.com', self.fetcher.get_eastmoney_minute_data),
+            'tencent': ('腾讯财经', 'ifzq.gtimg.cn', self.fetcher.get_tencent_minute_data),
+        }
+
+    async def get_minute_data(self, stock_code: str, period: int = 30,
+                              data_source: str = 'auto') -> Optional[pd.DataFrame]:
+        """
+        异步获取分钟级数据
+        data_source: 'sina', 'eastmoney', 'tencent', 'auto'
+        """
+        if data_source == 'auto':
+            return await self._fetch_auto(list(self.sources.values()), stock_code, period)
+        if data_source not in self.sources:
+            print(f"❌ 不支持的数据源: {data_source}")
+            return None
+        _, host, source_func = self.sources[data_source]
+        return await self.engine.run(host, source_func, stock_code, period)
+
+    async def get_minute_data_batch(self, stock_codes: List[str], period: int = 30,
+                                    data_source: str = 'auto') -> Dict[str, Optional[pd.DataFrame]]:
+        """并发获取多只股票的分钟级数据"""
+        return await self._fetch_many(self.get_minute_data, stock_codes, period, data_source)
+
+
+class AsyncRealtimeDataFetcher(_AsyncFetcherBase):
+    """RealtimeDataFetcher 的异步版本"""
+
+    def __init__(self, engine: Optional[AsyncFetchEngine] = None):
+        super().__init__(engine)
+        self.fetcher = RealtimeDataFetcher(transport=self.engine.transport)
+        self.minute_sources = {
+            'sina': ('新浪财经', 'money.finance.sina.com.cn', self.fetcher.get_sina_minute_data),
+            'eastmoney': ('东方财富', 'push2his.eastmoney.com', self.fetcher.get_eastmoney_minute_data),
+        }
+
+    async def get_realtime_data(self, stock_code: str) -> Optional[Dict]:
+        """异步获取单只股票的实时数据"""
+        return await self.engine.run('hq.sinajs.cn', self.fetcher.get_sina_realtime_data, stock_code)
+
+    async def get_realtime_batch(self, stock_codes: List[str], batch_size: int = None) -> Dict[str, Dict]:
+        """
+        异步批量获取实时数据
+        代码按新浪 list 接口的容量分组，各组并发请求
+        """
+        if batch_size is None:
+            batch_size = self.fetcher.SINA_BATCH_SIZE
+        codes = list(dict.fromkeys(stock_codes))
+        chunks = [codes[i:i + batch_size] for i in range(0, len(codes), batch_size)]
+        chunk_results = await asyncio.gather(*(
+            self.engine.run('hq.sinajs.cn', self.fetcher.get_sina_realtime_batch, chunk, batch_size)
+            for chunk in chunks
+        ))
+        results = {}
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        return results
+
+    async def get_minute_data(self, stock_code: str, days: int = 1,
+                              data_source: str = 'auto') -> Optional[pd.DataFrame]:
+        """
+        异步获取1分钟分时数据
+        data_source: 'sina', 'eastmoney', 'auto'
+        """
+        if data_source == 'auto':
+            return await self._fetch_auto(list(self.minute_sources.values()), stock_code, days)
+        if data_source not in self.minute_sources:
+            print(f"❌ 不支持的数据源: {data_source}")
+            return None
+        _, host, source_func = self.minute_sources[data_source]
+        return await self.engine.run(host, source_func, stock_code, days)
+
+    async def get_minute_data_batch(self, stock_codes: List[str], days: int = 1,
+                                    data_source: str = 'auto') -> Dict[str, Optional[pd.DataFrame]]:
+        """并发获取多只股票的1分钟分时数据"""
+        return await self._fetch_many(self.get_minute_data, stock_codes, days, data_source)
+
+
+class AsyncFinancialDataFetcher(_AsyncFetcherBase):
+    """FinancialDataFetcher 的异步版本"""
+
+    def __init__(self, engine: Optional[AsyncFetchEngine] = None):
+        super().__init__(engine)
+        self.fetcher = FinancialDataFetcher(transport=self.engine.transport)
+        self.sources = {
+            'eastmoney': ('东方财富', 'push2.eastmoney.com', self.fetcher.get_eastmoney_financial_data_fixed),
+            'sina': ('新浪财经', 'hq.sinajs.cn', self.fetcher.get_sina_financial_data_fixed),
+            'tencent': ('腾讯财经', 'qt.gtimg.cn', self.fetcher.get_tencent_financial_data_fixed),
+        }
+
+    async def get_financial_data_fixed(self, stock_code: str, data_source: str = 'auto') -> Optional[Dict]:
+        """
+        异步获取财务数据
+        data_source: 'auto', 'eastmoney', 'sina', 'tencent'
+        """
+        if data_source == 'auto':
+            return await self._fetch_auto(list(self.sources.values()), stock_code)
+        if data_source not in self.sources:
+            print(f"❌ 不支持的数据源: {data_source}")
+            return None
+        _, host, source_func = self.sources[data_source]
+        return await self.engine.run(host, source_func, stock_code)
+
+    async def get_financial_data_batch(self, stock_codes: List[str],
+                                       data_source: str = 'auto') -> Dict[str, Optional[Dict]]:
+        """并发获取多只股票的财务数据"""
+        return await self._fetch_many(self.get_financial_data_fixed, stock_codes, data_source)
+
+
+async def _demo():
+    stock_codes = ["sz000498", "sh600000", "sz000001"]
+
+    async with AsyncFetchEngine(per_host_limit=4) as engine:
+        kline_fetcher = AsyncKlineDataFetcher(engine)
+        realtime_fetcher = AsyncRealtimeDataFetcher(engine)
+
+        klines, quotes = await asyncio.gather(
+            kline_fetcher.get_kline_data_batch(stock_codes, days=90),
+            realtime_fetcher.get_realtime_batch(stock_codes),
+        )
+
+    for stock_code in stock_codes:
+        df = klines.get(stock_code)
+        count = len(df) if df is not None else 0
+        price = quotes.get(stock_code, {}).get('当前价格', 'N/A')
+        print(f"{stock_code}: K线 {count} 条, 当前价格 {price}")
+
+
+def main():
+    asyncio.run(_demo())
+
+
+if __name__ == "__main__":
+    main()
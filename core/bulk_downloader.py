@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量K线下载工具
+从股票代码列表文件读取代码，并发下载日K线或分钟K线并写入本地列式仓库（KlineStore）。
+每完成一批股票即写入检查点，任务中断后再次运行会跳过已完成的股票，继续下载剩余部分。
+检查点按目标交易日（最近一个已收盘的交易日）区分，下一个交易日收盘后再次运行会重新下载全部股票。
+
+用法:
+  python bulk_downloader.py --symbols symbols.txt --store-dir data --workers 8
+  python bulk_downloader.py --symbols symbols.txt --store-dir data --dataset minute --period 5
+  python bulk_downloader.py --symbols symbols.txt --store-dir data --restart   # 忽略检查点重新下载
+
+代码列表文件每行一个股票代码（如 sz000498），可带逗号分隔的名称，# 开头的行为注释
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+try:
+    from .http_transport import HttpTransport
+    from .kline_store import KlineStore
+    from .kline_data_fetcher import KlineDataFetcher
+    from .minute_data_fetcher import MinuteDataFetcher
+    from .trading_session import last_closed_trading_day
+except ImportError:
+    from http_transport import HttpTransport
+    from kline_store import KlineStore
+    from kline_data_fetcher import KlineDataFetcher
+    from minute_data_fetcher import MinuteDataFetcher
+    from trading_session import last_closed_trading_day
+
+
+def read_symbols(path: str) -> List[str]:
+    """读取股票代码列表文件，去重并保持顺序"""
+    symbols = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            symbols.append(line.split(',')[0].strip().lower())
+    return list(dict.fromkeys(symbols))
+
+
+class Checkpoint:
+    """记录已完成和失败的股票，原子写入JSON文件"""
+
+    def __init__(self, path: str, job: Dict, restart: bool = False):
+        self.path = path
+        self.job = job
+        self.completed = set()
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if not restart and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('job') == job:
+                self.completed = set(data.get('completed', []))
+                self.failed = data.get('failed', {})
+            else:
+                print(f"⚠️ 检查点的任务参数不同，忽略已有检查点: {path}")
+
+    def mark(self, symbol: str, error: Optional[str] = None):
+        with self._lock:
+            if error is None:
+                self.completed.add(symbol)
+                self.failed.pop(symbol, None)
+            else:
+                self.failed[symbol] = error
+
+    def save(self):
+        with self._lock:
+            data = {
+                'job': self.job,
+                'updated': datetime.datetime.now().isoformat(),
+                'completed': sorted(self.completed),
+                'failed': dict(self.failed),
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class BulkDownloader:
+    def __init__(self, store_dir: str, dataset: str = 'daily', period: int = 30, days: int = 250,
+                 data_source: str = 'auto', workers: int = 8, transport: Optional[HttpTransport] = None):
+        """
+        store_dir: 列式仓库根目录
+        dataset: 'daily' 日K线，'minute' 分钟K线
+        period: 分钟K线周期（dataset='minute' 时有效）
+        days: 日K线天数（dataset='daily' 时有效）
+        workers: 并发下载的线程数
+        """
+        if dataset not in ('daily', 'minute'):
+            raise ValueError(f"不支持的数据集: {dataset}")
+
+        self.dataset = dataset
+        self.period = period
+        self.days = days
+        self.data_source = data_source
+        self.workers = workers
+        self.transport = transport or HttpTransport(pool_maxsize=max(workers, 10))
+
+        if dataset == 'daily':
+            self.store = KlineStore(store_dir, time_column='日期', dataset='daily')
+            # 设置仓库后 get_kline_data 只增量下载缺失的最新K线并合并保存
+            self.fetcher = KlineDataFetcher(transport=self.transport, store=self.store)
+        else:
+            self.store = KlineStore(store_dir, time_column='时间', dataset=f'{period}min')
+            self.fetcher = MinuteDataFetcher(transport=self.transport)
+
+    def job_signature(self) -> Dict:
+        """
+        检查点对应的任务参数，参数不同的检查点不会被复用
+        包含目标交易日：检查点只用于续传同一交易日中断的任务，新的交易日重新下载全部股票
+        """
+        job = {'dataset': self.store.dataset, 'data_source': self.data_source,
+               'trade_date': last_closed_trading_day().isoformat()}
+        if self.dataset == 'daily':
+            job['days'] = self.days
+        return job
+
+    def download_one(self, symbol: str) -> int:
+        """下载一只股票并写入仓库，返回仓库中的数据条数"""
+        if self.dataset == 'daily':
+            df = self.fetcher.get_kline_data(symbol, self.days, self.data_source)
+            if df is None or df.empty:
+                raise RuntimeError('没有获取到数据')
+            return len(df)
+
+        df = self.fetcher.get_minute_data(symbol, self.period, self.data_source)
+        if df is None or df.empty:
+            raise RuntimeError('没有获取到数据')
+        return len(self.store.merge(symbol, df))
+
+    def run(self, symbols: List[str], checkpoint: Checkpoint, save_every: int = 20,
+            progress=sys.stderr) -> Dict[str, int]:
+        """
+        并发下载所有未完成的股票
+        每完成 save_every 只股票写一次检查点；中断（Ctrl+C）时写入检查点后退出
+        """
+        pending = [s for s in symbols if s not in checkpoint.completed]
+        total = len(symbols)
+        done_before = total - len(pending)
+        print(f"📋 共 {total} 只股票，已完成 {done_before} 只，本次下载 {len(pending)} 只", file=progress)
+
+        started = time.time()
+        finished = 0
+        failures = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {executor.submit(self.download_one, symbol): symbol for symbol in pending}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    future.result()
+                    checkpoint.mark(symbol)
+                except Exception as e:
+                    checkpoint.mark(symbol, str(e))
+                    failures += 1
+
+                finished += 1
+                if finished % save_every == 0 or finished == len(pending):
+                    checkpoint.save()
+                    elapsed = time.time() - started
+                    rate = finished / elapsed if elapsed > 0 else 0
+                    eta = (len(pending) - finished) / rate if rate > 0 else 0
+                    print(f"⏳ {done_before + finished}/{total}  失败 {failures}  "
+                          f"{rate:.1f} 只/秒  预计剩余 {eta:.0f} 秒", file=progress)
+        except KeyboardInterrupt:
+            print("\n⚠️ 已中断，保存检查点后退出，再次运行将从中断处继续", file=progress)
+            executor.shutdown(wait=False, cancel_futures=True)
+            checkpoint.save()
+            raise
+        finally:
+            executor.shutdown(wait=False)
+
+        checkpoint.save()
+        return {'total': total, 'completed': len(checkpoint.completed), 'failed': len(checkpoint.failed)}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='批量下载K线数据到本地列式仓库，支持断点续传')
+    parser.add_argument('--symbols', required=True, help='股票代码列表文件，每行一个代码')
+    parser.add_argument('--store-dir', required=True, help='列式仓库根目录')
+    parser.add_argument('--dataset', choices=['daily', 'minute'], default='daily', help='日K线或分钟K线')
+    parser.add_argument('--period', type=int, default=30, choices=[1, 5, 15, 30, 60], help='分钟K线周期')
+    parser.add_argument('--days', type=int, default=250, help='日K线天数')
+    parser.add_argument('--data-source', default='auto', help='数据源，同 get_kline_data / get_minute_data')
+    parser.add_argument('--workers', type=int, default=8, help='并发下载的线程数')
+    parser.add_argument('--checkpoint', help='检查点文件路径，默认保存在仓库目录下')
+    parser.add_argument('--restart', action='store_true', help='忽略已有检查点，重新下载全部股票')
+    parser.add_argument('--quiet', action='store_true', help='不输出每只股票的获取日志，只显示进度')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    symbols = read_symbols(args.symbols)
+    if not symbols:
+        print(f"❌ 代码列表为空: {args.symbols}")
+        return
+
+    downloader = BulkDownloader(args.store_dir, args.dataset, args.period, args.days,
+                                args.data_source, args.workers)
+    checkpoint_path = args.checkpoint or os.path.join(
+        args.store_dir, f"{downloader.store.dataset}_checkpoint.json")
+    checkpoint = Checkpoint(checkpoint_path, downloader.job_signature(), restart=args.restart)
+
+    stdout = sys.stdout
+    if args.quiet:
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    try:
+        summary = downloader.run(symbols, checkpoint)
+    except KeyboardInterrupt:
+        return
+    finally:
+        if args.quiet:
+            sys.stdout.close()
+            sys.stdout = stdout
+        downloader.transport.close()
+
+    print(f"\n✅ 下载完成: {summary['completed']}/{summary['total']} 只成功，{summary['failed']} 只失败")
+    if checkpoint.failed:
+        print(f"失败的股票已记录在检查点中，再次运行将重试: {checkpoint_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式文件读写
+安装了 pyarrow 时使用 Parquet（zstd 压缩，适合长期存储）或 Feather（lz4 压缩，
+支持内存映射读取，适合频繁重新加载），否则回退到 NumPy 压缩的 .npz 文件。
+各格式都保留列的数值和时间类型，读取时无需再次解析
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+PARQUET_EXT = '.parquet'
+FEATHER_EXT = '.feather'
+NPZ_EXT = '.npz'
+
+# 格式名称到扩展名的映射
+FORMAT_EXTENSIONS = {
+    'parquet': PARQUET_EXT,
+    'feather': FEATHER_EXT,
+    'npz': NPZ_EXT,
+}
+
+# 已提示过回退为 .npz 的格式，每种格式只提示一次
+_fallback_warned = set()
+
+
+def default_extension() -> str:
+    """当前环境下默认使用的列式文件扩展名"""
+    return PARQUET_EXT if HAS_PYARROW else NPZ_EXT
+
+
+def extension_for(fmt: str) -> str:
+    """
+    返回格式对应的扩展名
+    未安装 pyarrow 时 parquet/feather 回退为 npz（每种格式只提示一次）
+    """
+    ext = FORMAT_EXTENSIONS.get(fmt)
+    if ext is None:
+        raise ValueError(f"不支持的列式文件格式: {fmt}，可选 {list(FORMAT_EXTENSIONS)}")
+    if ext != NPZ_EXT and not HAS_PYARROW:
+        if fmt not in _fallback_warned:
+            _fallback_warned.add(fmt)
+            print(f"⚠️ 未安装 pyarrow，{fmt} 格式回退为 .npz")
+        return NPZ_EXT
+    return ext
+
+
+def find_columnar_file(base_path: str) -> Optional[str]:
+    """查找不带扩展名的路径对应的已有列式文件"""
+    for ext in (PARQUET_EXT, FEATHER_EXT, NPZ_EXT):
+        if os.path.exists(base_path + ext):
+            return base_path + ext
+    return None
+
+
+def write_columnar(df: pd.DataFrame, path: str) -> str:
+    """
+    按扩展名写入列式文件
+    写入先落到临时文件再替换，避免中断时留下损坏的文件
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+
+    if path.endswith(PARQUET_EXT):
+        df.to_parquet(tmp_path, index=False, compression='zstd')
+    elif path.endswith(FEATHER_EXT):
+        # Feather 不保存非默认索引
+        df.reset_index(drop=True).to_feather(tmp_path, compression='lz4')
+    elif path.endswith(NPZ_EXT):
+        arrays = {}
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            arrays[f'col_{i}'] = values
+        # np.savez 会自动追加 .npz 扩展名，因此写入文件对象
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, __columns__=np.array(df.columns, dtype=str), **arrays)
+    else:
+        raise ValueError(f"不支持的列式文件格式: {path}")
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_columnar(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    读取 write_columnar 写入的列式文件
+    columns: 只读取指定的列，Parquet/Feather 不会读取其余列的数据
+    Feather 以内存映射方式读取，未压缩的列可直接引用映射的内存
+    """
+    if path.endswith(PARQUET_EXT):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith(FEATHER_EXT):
+        from pyarrow import feather
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+    if path.endswith(NPZ_EXT):
+        with np.load(path, allow_pickle=False) as data:
+            names = [str(col) for col in data['__columns__']]
+            wanted = set(columns) if columns is not None else None
+            return pd.DataFrame({col: data[f'col_{i}'] for i, col in enumerate(names)
+                                 if wanted is None or col in wanted})
+    raise ValueError(f"不支持的列式文件格式: {path}")
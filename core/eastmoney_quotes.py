@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+东方财富批量行情（push2 ulist.np 接口）
+一次请求可带数百个 secid，返回每只股票一条记录；
+实时行情和财务快照共用同一次请求的字段，由各获取器转换为列式结构。
+ulist 使用列表接口的字段编号（f2 最新价、f9 市盈率等），与单只股票 stock/get 接口的 f43~f169 不同
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .field_spec import FieldSpec, RecordParser
+except ImportError:
+    from field_spec import FieldSpec, RecordParser
+
+ULIST_URL = "http://push2.eastmoney.com/api/qt/ulist.np/get"
+
+# 单次请求的 secid 数量
+ULIST_BATCH_SIZE = 500
+
+# ulist 字段（fltt=2 时价格为元，涨跌幅/换手率为百分数，成交量单位为手，金额和市值单位为元）
+ULIST_FIELDS = RecordParser([
+    FieldSpec('name', 'f14', 'str', default=''),
+    FieldSpec('price', 'f2'),
+    FieldSpec('change_percent', 'f3'),
+    FieldSpec('change', 'f4'),
+    FieldSpec('volume', 'f5', 'int', scale=100),  # 手转换为股
+    FieldSpec('amount', 'f6'),
+    FieldSpec('turnover_rate', 'f8'),
+    FieldSpec('pe', 'f9'),  # 市盈率(动态)
+    FieldSpec('high', 'f15'),
+    FieldSpec('low', 'f16'),
+    FieldSpec('open', 'f17'),
+    FieldSpec('pre_close', 'f18'),
+    FieldSpec('total_market_cap', 'f20'),
+    FieldSpec('float_market_cap', 'f21'),
+    FieldSpec('pb', 'f23'),
+    FieldSpec('exchange_time', 'f124', default=None),  # 行情时间（Unix秒）
+])
+
+# 请求的字段，f12/f13 为代码和市场，用于把记录对应回 secid
+ULIST_REQUEST_FIELDS = ','.join(['f12', 'f13'] + [spec.key for spec in ULIST_FIELDS.specs])
+
+
+def to_secid(stock_code: str) -> Optional[str]:
+    """sz000498 → 0.000498，sh600000 → 1.600000，不支持的格式返回 None"""
+    if stock_code.startswith('sz'):
+        return f"0.{stock_code[2:]}"
+    if stock_code.startswith('sh'):
+        return f"1.{stock_code[2:]}"
+    return None
+
+
+def iter_ulist_records(data: Dict) -> Iterator[Tuple[str, Dict]]:
+    """从 ulist 响应中产出 (secid, 记录)；data.diff 可能是列表，也可能是以序号为键的字典"""
+    diff = (data.get('data') or {}).get('diff') or []
+    if isinstance(diff, dict):
+        diff = diff.values()
+    for record in diff:
+        yield f"{record.get('f13')}.{record.get('f12')}", record
+
+
+def fetch_ulist(transport, stock_codes: List[str], headers: Dict,
+                batch_size: int = ULIST_BATCH_SIZE) -> Tuple[List[str], List[Dict]]:
+    """
+    按 batch_size 分组请求 ulist 接口
+    返回 (股票代码列表, 原始记录列表)，两者一一对应，顺序与 stock_codes 一致；获取失败的代码不在结果中
+    """
+    # 去重并保持原有顺序
+    codes = list(dict.fromkeys(stock_codes))
+    secids = {}
+    for code in codes:
+        secid = to_secid(code)
+        if secid is None:
+            print(f"❌ 不支持的股票代码格式: {code}")
+            continue
+        secids[secid] = code
+
+    secid_list = list(secids)
+    found: Dict[str, Dict] = {}
+    for start in range(0, len(secid_list), batch_size):
+        chunk = secid_list[start:start + batch_size]
+        params = {
+            'secids': ','.join(chunk),
+            'fields': ULIST_REQUEST_FIELDS,
+            'fltt': '2',
+            'invt': '2',
+            'np': '1',
+            'ut': 'fa5fd1943c7b386f172d6893dbfba10b',
+        }
+        try:
+            response = transport.get(ULIST_URL, params=params, headers=headers)
+            if response.status_code != 200:
+                print(f"❌ 东方财富批量请求失败 ({len(chunk)} 个代码): HTTP {response.status_code}")
+                continue
+            for secid, record in iter_ulist_records(response.json()):
+                if secid in secids:
+                    found[secid] = record
+        except Exception as e:
+            print(f"获取东方财富批量行情失败 ({len(chunk)} 个代码): {e}")
+
+    result_codes = [secids[secid] for secid in secid_list if secid in found]
+    records = [found[secid] for secid in secid_list if secid in found]
+    return result_codes, records
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+声明式字段解析
+每个数据源用一组 FieldSpec（字段名、位置或键、类型、换算系数）描述返回记录的格式，
+RecordParser 在创建时把字段说明转换为取值函数（itemgetter）和换算表，解析时不再重复定义闭包；
+parse_many 将一批原始记录按列批量转换为类型化的 NumPy 数组，适合全市场快照
+"""
+
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+class FieldSpec(NamedTuple):
+    """
+    name: 输出字段名
+    key: 字段位置（列表记录）或键名（字典记录）
+    dtype: 'float'、'int' 或 'str'
+    scale: 数值乘以的换算系数（如 万元 → 元 为 10000）
+    default: 原始值为空或无法解析时的取值，不参与换算
+    """
+    name: str
+    key: Union[int, str]
+    dtype: str = 'float'
+    scale: float = 1.0
+    default: Any = 0
+
+
+def _to_float(value, scale, default):
+    if value is None or value == '':
+        return default
+    try:
+        return float(value) * scale
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_int(value, scale, default):
+    if value is None or value == '':
+        return default
+    try:
+        return int(float(value) * scale)
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_str(value, scale, default):
+    return default if value is None else str(value)
+
+
+_CONVERTERS = {'float': _to_float, 'int': _to_int, 'str': _to_str}
+
+
+def _make_getter(key: Union[int, str]) -> Callable[[Any], Any]:
+    if isinstance(key, int):
+        getter = itemgetter(key)
+
+        def get_item(record):
+            try:
+                return getter(record)
+            except IndexError:
+                return None
+        return get_item
+    return lambda record: record.get(key)
+
+
+def _make_tuple_getter(keys: Sequence[Union[int, str]]) -> Callable[[Any], tuple]:
+    """返回一次取出多个字段的函数，结果总是元组"""
+    if not keys:
+        return lambda record: ()
+    getter = itemgetter(*keys)
+    if len(keys) == 1:
+        return lambda record: (getter(record),)
+    return getter
+
+
+def _to_float_array(column: Sequence) -> np.ndarray:
+    """字符串/数值列转换为 float64 数组，空值和无法解析的值为 NaN"""
+    try:
+        return np.array(column, dtype=np.float64)
+    except (ValueError, TypeError):
+        pass
+    try:
+        # 常见情况：只有空串（如亏损股票的市盈率）
+        return np.array([np.nan if v == '' or v is None else v for v in column], dtype=np.float64)
+    except (ValueError, TypeError):
+        return pd.to_numeric(pd.Series(column, dtype=object), errors='coerce').to_numpy(dtype=np.float64, copy=True)
+
+
+class RecordParser:
+    def __init__(self, specs: Sequence[FieldSpec]):
+        for spec in specs:
+            if spec.dtype not in _CONVERTERS:
+                raise ValueError(f"不支持的字段类型: {spec.name} {spec.dtype}")
+        self.specs = tuple(specs)
+        self.names = [spec.name for spec in self.specs]
+        self._fields = [(spec.name, _make_getter(spec.key), _CONVERTERS[spec.dtype], spec.scale, spec.default)
+                        for spec in self.specs]
+        positions = [spec.key for spec in self.specs if isinstance(spec.key, int)]
+        # 列表记录至少需要的字段数
+        self.min_length = max(positions) + 1 if positions else 0
+
+        # 快速路径：数值字段一次 itemgetter 取出后整体 map(float)，再对少数有换算系数或整数的字段单独处理
+        numeric = [spec for spec in self.specs if spec.dtype != 'str']
+        self._numeric_names = [spec.name for spec in numeric]
+        self._get_numeric = _make_tuple_getter([spec.key for spec in numeric])
+        self._scaled = [(i, spec.scale) for i, spec in enumerate(numeric)
+                        if spec.dtype == 'float' and spec.scale != 1.0]
+        self._ints = [(i, spec.scale) for i, spec in enumerate(numeric) if spec.dtype == 'int']
+        self._str_getters = [(spec.name, itemgetter(spec.key)) for spec in self.specs if spec.dtype == 'str']
+
+    def parse(self, record) -> Dict[str, Any]:
+        """解析单条记录，返回 {字段名: 转换后的值}"""
+        try:
+            # 任一字段缺失、为空或无法解析时抛出异常，退回逐字段的安全转换
+            values = list(map(float, self._get_numeric(record)))
+            for i, scale in self._scaled:
+                values[i] *= scale
+            for i, scale in self._ints:
+                values[i] = int(values[i] * scale)
+            result = dict(zip(self._numeric_names, values))
+            for name, get in self._str_getters:
+                result[name] = get(record)
+            return result
+        except (ValueError, TypeError, IndexError, KeyError):
+            return {name: convert(get(record), scale, default)
+                    for name, get, convert, scale, default in self._fields}
+
+    def parse_many(self, records: Iterable) -> Dict[str, np.ndarray]:
+        """
+        按列批量解析一批记录
+        数值字段整列转换为 float64 / int64 数组，字符串字段返回 object 数组
+        """
+        records = records if isinstance(records, list) else list(records)
+        if not records:
+            return {name: np.array([], dtype=object if spec.dtype == 'str' else np.float64)
+                    for name, spec in zip(self.names, self.specs)}
+        complete = all(len(record) >= self.min_length for record in records)
+        columns = {}
+        for spec, (_, get, _, _, _) in zip(self.specs, self._fields):
+            if isinstance(spec.key, int) and complete:
+                raw = list(map(itemgetter(spec.key), records))
+            else:
+                raw = [get(record) for record in records]
+            if spec.dtype == 'str':
+                columns[spec.name] = np.array([spec.default if v is None else str(v) for v in raw], dtype=object)
+                continue
+
+            values = _to_float_array(raw)
+            if spec.scale != 1.0:
+                values *= spec.scale
+            # 与单条解析一致：空值和无法解析的值取默认值
+            missing = np.isnan(values)
+            if spec.default is not None:
+                values[missing] = spec.default
+            if spec.dtype == 'int':
+                # 默认值为 None 且存在缺失值时保留 float64（NaN）
+                if spec.default is not None or not missing.any():
+                    values = values.astype(np.int64)
+            columns[spec.name] = values
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.specs)
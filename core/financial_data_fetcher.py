@@ -7,14 +7,110 @@
 
 import datetime
 import json
+import logging
 import time
-from typing import Dict, Optional
-
-import requests
-
-
-class FinancialDataFetcher:
-    def __init__(self):
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .http_transport import HttpTransport
+    from .source_race import MultiSourceFetcher, SourceRacer
+    from .source_health import SourceHealthTracker
+    from .snapshot_cache import SnapshotCache
+    from .quote_records import (FinancialQuote, SINA_TIME_FORMAT, TENCENT_TIME_FORMAT,
+                                exchange_timestamp, financial_quotes_from_columns, parse_exchange_times)
+    from .quote_consensus import build_consensus
+    from .field_spec import FieldSpec, RecordParser
+    from .eastmoney_quotes import ULIST_BATCH_SIZE, ULIST_FIELDS, fetch_ulist
+    from .sina_quotes import SINA_BATCH_SIZE, fetch_sina_texts, iter_sina_records
+except ImportError:
+    from http_transport import HttpTransport
+    from source_race import MultiSourceFetcher, SourceRacer
+    from source_health import SourceHealthTracker
+    from snapshot_cache import SnapshotCache
+    from quote_records import (FinancialQuote, SINA_TIME_FORMAT, TENCENT_TIME_FORMAT,
+                               exchange_timestamp, financial_quotes_from_columns, parse_exchange_times)
+    from quote_consensus import build_consensus
+    from field_spec import FieldSpec, RecordParser
+    from eastmoney_quotes import ULIST_BATCH_SIZE, ULIST_FIELDS, fetch_ulist
+    from sina_quotes import SINA_BATCH_SIZE, fetch_sina_texts, iter_sina_records
+
+logger = logging.getLogger(__name__)
+
+# 腾讯财经 qt.gtimg.cn 字段位置（'~' 分隔）
+TENCENT_FIELDS = RecordParser([
+    FieldSpec('name', 1, 'str', default=''),
+    FieldSpec('price', 3),
+    FieldSpec('pre_close', 4),
+    FieldSpec('open', 5),
+    FieldSpec('volume', 6, 'int', scale=100),  # 成交量单位是手，转换为股
+    FieldSpec('change', 31),
+    FieldSpec('change_percent', 32),
+    FieldSpec('high', 33),
+    FieldSpec('low', 34),
+    # 字段[36]为成交量（手，与[6]相同），[37]为成交额（万元）
+    FieldSpec('amount', 37, scale=10000),  # 万元转换为元
+    FieldSpec('turnover_rate', 38),  # 换手率（%）
+    FieldSpec('pe', 39),  # 市盈率(动态)
+    FieldSpec('pb', 46),
+    FieldSpec('float_market_cap', 44, scale=100000000),  # 流通市值单位是亿元
+    FieldSpec('total_market_cap', 45, scale=100000000),  # 总市值单位是亿元
+])
+
+# 新浪财经 hq.sinajs.cn 字段位置（',' 分隔）
+SINA_FIELDS = RecordParser([
+    FieldSpec('name', 0, 'str', default=''),
+    FieldSpec('open', 1),
+    FieldSpec('pre_close', 2),
+    FieldSpec('price', 3),
+    FieldSpec('high', 4),
+    FieldSpec('low', 5),
+    FieldSpec('volume', 8, 'int'),
+    FieldSpec('amount', 9),
+])
+
+# 新浪财经 getHQNodeData 财务指标，市值单位是万元
+SINA_FINANCE_FIELDS = RecordParser([
+    FieldSpec('pe', 'per'),
+    FieldSpec('pb', 'pb'),
+    FieldSpec('total_market_cap', 'mktcap', scale=10000),
+    FieldSpec('float_market_cap', 'nmc', scale=10000),
+    FieldSpec('turnover_rate', 'turnoverratio'),
+])
+
+# 东方财富 push2 stock/get 字段
+EASTMONEY_FIELDS = RecordParser([
+    FieldSpec('name', 'f58', 'str', default=''),
+    FieldSpec('price', 'f44'),
+    FieldSpec('pre_close', 'f48'),
+    FieldSpec('open', 'f47'),
+    FieldSpec('high', 'f45'),
+    FieldSpec('low', 'f46'),
+    FieldSpec('volume', 'f51'),
+    FieldSpec('amount', 'f52'),
+    FieldSpec('change', 'f49'),
+    FieldSpec('change_percent', 'f50'),
+    FieldSpec('turnover_rate', 'f168'),  # 使用f168字段获取换手率
+    FieldSpec('pe', 'f57'),
+    FieldSpec('pb', 'f127'),
+    FieldSpec('total_market_cap', 'f116'),  # 使用f116字段获取总市值
+    FieldSpec('float_market_cap', 'f117'),  # 使用f117字段获取流通市值
+    FieldSpec('exchange_time', 'f86', default=None),  # 行情时间（Unix秒）
+])
+
+
+class FinancialDataFetcher(MultiSourceFetcher):
+    # 腾讯行情接口单次请求的股票数量
+    TENCENT_BATCH_SIZE = 100
+    # 新浪 list 接口单次请求的最大代码数（受URL长度限制）
+    SINA_BATCH_SIZE = SINA_BATCH_SIZE
+
+    def __init__(self, transport: Optional[HttpTransport] = None, racer: Optional[SourceRacer] = None,
+                 cache: Optional[SnapshotCache] = None,
+                 health: Optional[SourceHealthTracker] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -22,106 +118,135 @@ class FinancialDataFetcher:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive'
         }
+        self._init_sources(transport, racer, health)
+        # 快照缓存，多个调用方可共享同一实例以合并短时间内的重复请求
+        self.cache = cache
 
     def get_tencent_financial_data_fixed(self, stock_code: str) -> Optional[Dict]:
         """
         从腾讯财经获取财务数据 - 修复版本
         修复了字段解析错误和单位转换问题
         """
-        try:
-            # 腾讯财经财务数据API
-            url = f"http://qt.gtimg.cn/q={stock_code}"
-
-            response = requests.get(url, headers=self.headers, timeout=10)
-
-            if response.status_code == 200 and response.text.strip():
-                # 解析腾讯财经数据
-                if f'v_{stock_code}=' in response.text:
-                    data_part = response.text.split('="')[1].split('";')[0]
-                    stock_data = data_part.split('~')
-
-                    # 调试信息
-                    print(f"腾讯财经原始数据长度: {len(stock_data)}")
-                    if len(stock_data) > 45:
-                        print(f"关键字段值:")
-                        print(f"  股票名称: {stock_data[0]}")
-                        print(f"  当前价格: {stock_data[2]}")
-                        print(f"  换手率: {stock_data[37]}")
-                        print(f"  总市值: {stock_data[40]}")
-                        print(f"  流通市值: {stock_data[41]}")
-
-                    def safe_float(value, default=0):
-                        try:
-                            return float(value) if value and value != '' else default
-                        except (ValueError, TypeError):
-                            return default
-
-                    def safe_int(value, default=0):
-                        try:
-                            return int(float(value)) if value and value != '' else default
-                        except (ValueError, TypeError):
-                            return default
-
-                    def format_market_cap(value):
-                        """格式化市值显示"""
-                        try:
-                            val = float(value)
-                            if val >= 100000000:  # 大于1亿
-                                return f"{val / 100000000:.2f}亿"
-                            elif val >= 10000:  # 大于1万
-                                return f"{val / 10000:.2f}万"
-                            else:
-                                return f"{val:,.0f}"
-                        except:
-                            return "0"
-
-                    def format_turnover_rate(value):
-                        """格式化换手率"""
-                        try:
-                            val = float(value)
-                            if 0 < val <= 100:  # 正常换手率范围
-                                return f"{val:.2f}%"
-                            else:
-                                return "-"
-                        except:
-                            return "-"
-
-                    financial_data = {
-                        '股票代码': stock_code,
-                        '股票名称': stock_data[1] if len(stock_data) > 1 else '',  # 修正：股票名称在字段[1]
-                        '当前价格': safe_float(stock_data[3]),  # 修正：当前价格在字段[3]
-                        '昨收价': safe_float(stock_data[4]),  # 修正：昨收价在字段[4]
-                        '开盘价': safe_float(stock_data[5]),  # 修正：开盘价在字段[5]
-                        '最高价': safe_float(stock_data[33]),
-                        '最低价': safe_float(stock_data[34]),
-                        '成交量': safe_int(stock_data[6]),  # 修正：成交量在字段[6]
-                        '成交额': safe_float(stock_data[36]) * 10000,  # 转换为元
-                        '换手率': f"{safe_float(stock_data[37]) / 10000:.2f}%" if safe_float(
-                            stock_data[37]) > 0 else '-',  # 修正：换手率需要除以10000
-                        '市盈率(动态)': safe_float(stock_data[38]) if safe_float(stock_data[38]) > 0 else "N/A",
-                        '市净率': safe_float(stock_data[39]),
-                        '总市值': f"{safe_float(stock_data[45]):.2f}亿" if safe_float(stock_data[45]) > 0 else "0",
-                        # 修正：总市值在字段[45]，单位是亿元
-                        '流通市值': f"{safe_float(stock_data[44]):.2f}亿" if safe_float(stock_data[44]) > 0 else "0",
-                        # 修正：流通市值在字段[44]，单位是亿元
-                        '涨跌额': safe_float(stock_data[31]),
-                        '涨跌幅': f"{safe_float(stock_data[32]):.2f}%" if safe_float(stock_data[32]) != 0 else '-',
-                        '数据来源': '腾讯财经',
-                        '数据时间戳': datetime.datetime.now().isoformat()
-                    }
+        quote = self.get_tencent_financial_quote(stock_code)
+        return quote.to_dict() if quote is not None else None
 
-                    return financial_data
-            return None
+    def get_tencent_financial_quote(self, stock_code: str) -> Optional[FinancialQuote]:
+        """从腾讯财经获取财务快照，返回原始数值的 FinancialQuote"""
+        return self.get_tencent_financial_quotes_batch([stock_code]).get(stock_code)
 
-        except Exception as e:
-            print(f"获取腾讯财经财务数据失败: {e}")
+    def get_tencent_financial_quotes_batch(self, stock_codes: List[str],
+                                           batch_size: int = None) -> Dict[str, FinancialQuote]:
+        """
+        批量获取腾讯财经财务快照
+        qt.gtimg.cn 支持逗号分隔的多个代码，一次请求返回多条 v_xxx="..." 记录；
+        按 batch_size 分组请求，返回以股票代码为键的 FinancialQuote
+        """
+        results = {}
+        for text in self._fetch_tencent_texts(stock_codes, batch_size):
+            results.update(self.parse_tencent_quotes(text))
+        return results
+
+    def get_tencent_financial_snapshot(self, stock_codes: List[str],
+                                       batch_size: int = None) -> Optional[pd.DataFrame]:
+        """
+        批量获取腾讯财经财务快照，返回以股票代码为索引的列式表（原始数值）
+        记录按列批量转换为数组，不逐条创建 FinancialQuote；
+        成交量已由 TENCENT_FIELDS 换算为股，exchange_time 为行情时间（Unix秒）
+        """
+        codes, records = [], []
+        for text in self._fetch_tencent_texts(stock_codes, batch_size):
+            for stock_code, stock_data in self._iter_tencent_records(text):
+                if len(stock_data) >= TENCENT_FIELDS.min_length:
+                    codes.append(stock_code)
+                    records.append(stock_data)
+        if not records:
             return None
 
+        fetched_at = time.time()
+        df = pd.DataFrame(TENCENT_FIELDS.parse_many(records), index=pd.Index(codes, name='code'))
+        df['source'] = '腾讯财经'
+        df['fetched_at'] = fetched_at
+        # 字段[30]为行情时间
+        df['exchange_time'] = parse_exchange_times((r[30] for r in records), TENCENT_TIME_FORMAT)
+        # 列顺序与 financial_quotes_to_frame 一致
+        return df[[field for field in FinancialQuote.__slots__ if field != 'code']]
+
+    def _fetch_tencent_texts(self, stock_codes: List[str], batch_size: int = None) -> Iterator[str]:
+        """按 batch_size 分组请求腾讯行情接口，逐批产出响应文本"""
+        if batch_size is None:
+            batch_size = self.TENCENT_BATCH_SIZE
+
+        # 去重并保持原有顺序
+        codes = list(dict.fromkeys(stock_codes))
+        for start in range(0, len(codes), batch_size):
+            chunk = codes[start:start + batch_size]
+            try:
+                # 腾讯财经财务数据API
+                url = f"http://qt.gtimg.cn/q={','.join(chunk)}"
+
+                response = self.transport.get(url, headers=self.headers)
+
+                if response.status_code == 200 and response.text.strip():
+                    yield response.text
+
+            except Exception as e:
+                print(f"获取腾讯财经财务数据失败 ({len(chunk)} 个代码): {e}")
+
+    @staticmethod
+    def _iter_tencent_records(text: str) -> Iterator[Tuple[str, List[str]]]:
+        """逐条拆分腾讯返回文本，产出 (股票代码, 字段列表)"""
+        for record in text.split(';'):
+            record = record.strip()
+            if not record.startswith('v_'):
+                continue
+
+            head, _, rest = record.partition('="')
+            stock_code = head[len('v_'):]
+            data_part = rest.rsplit('"', 1)[0]
+            if not data_part:
+                # 无效代码时腾讯返回 v_pv_none_match="1" 或空字符串
+                continue
+            yield stock_code, data_part.split('~')
+
+    def parse_tencent_quotes(self, text: str) -> Dict[str, FinancialQuote]:
+        """
+        解析腾讯返回的多条记录
+        字段按列批量转换（TENCENT_FIELDS.parse_many）后直接构造 FinancialQuote，不逐条解析
+        """
+        codes, records = [], []
+        for stock_code, stock_data in self._iter_tencent_records(text):
+            if len(stock_data) < TENCENT_FIELDS.min_length:
+                continue
+            # 调试信息，仅在 DEBUG 级别输出
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("腾讯财经 %s 原始数据长度: %d，股票名称: %s，当前价格: %s，换手率: %s，总市值: %s，流通市值: %s",
+                             stock_code, len(stock_data), stock_data[1], stock_data[3], stock_data[38],
+                             stock_data[45], stock_data[44])
+            codes.append(stock_code)
+            records.append(stock_data)
+
+        return self._build_tencent_quotes(codes, records)
+
+    @staticmethod
+    def _build_tencent_quotes(codes: List[str], records: List[List[str]]) -> Dict[str, FinancialQuote]:
+        """由已拆分的腾讯记录按列构造 FinancialQuote，同一批记录共享同一个获取时间"""
+        exchange_times = [exchange_timestamp(stock_data[30], TENCENT_TIME_FORMAT) for stock_data in records]
+        return financial_quotes_from_columns(codes, '腾讯财经', TENCENT_FIELDS.parse_many(records),
+                                             exchange_times, time.time())
+
     def get_sina_financial_data_fixed(self, stock_code: str) -> Optional[Dict]:
         """
         从新浪财经获取财务数据 - 修复版本
         修复了单位转换问题
         """
+        quote = self.get_sina_financial_quote(stock_code)
+        return quote.to_dict() if quote is not None else None
+
+    def get_sina_financial_quote(self, stock_code: str) -> Optional[FinancialQuote]:
+        """
+        从新浪财经获取财务快照，返回原始数值的 FinancialQuote
+        财务指标接口不可用时，市盈率、市值等字段为 None
+        """
         try:
             # 更新headers，添加Referer
             sina_headers = self.headers.copy()
@@ -129,7 +254,7 @@ class FinancialDataFetcher:
 
             # 1. 获取实时行情数据
             realtime_url = f"http://hq.sinajs.cn/list={stock_code}"
-            realtime_response = requests.get(realtime_url, headers=sina_headers, timeout=10)
+            realtime_response = self.transport.get(realtime_url, headers=sina_headers)
 
             if realtime_response.status_code != 200:
                 return None
@@ -147,51 +272,25 @@ class FinancialDataFetcher:
                 if len(realtime_data) < 32:
                     return None
 
-                def safe_float(value, default=0):
-                    try:
-                        return float(value) if value and value != '' else default
-                    except (ValueError, TypeError):
-                        return default
-
-                def safe_int(value, default=0):
-                    try:
-                        return int(float(value)) if value and value != '' else default
-                    except (ValueError, TypeError):
-                        return default
-
-                def format_market_cap(value):
-                    """格式化市值显示"""
-                    try:
-                        val = float(value)
-                        if val >= 100000000:  # 大于1亿
-                            return f"{val / 100000000:.2f}亿"
-                        elif val >= 10000:  # 大于1万
-                            return f"{val / 10000:.2f}万"
-                        else:
-                            return f"{val:,.0f}"
-                    except:
-                        return "0"
-
-                current_price = safe_float(realtime_data[3])
-                pre_close = safe_float(realtime_data[2])
-                change = current_price - pre_close
+                fields = SINA_FIELDS.parse(realtime_data)
+                change = fields['price'] - fields['pre_close']
+                pre_close = fields['pre_close']
                 change_pct = (change / pre_close * 100) if pre_close > 0 else 0
 
-                financial_data = {
-                    '股票代码': stock_code,
-                    '股票名称': realtime_data[0] if len(realtime_data) > 0 else '',
-                    '当前价格': current_price,
-                    '昨收价': pre_close,
-                    '开盘价': safe_float(realtime_data[1]),
-                    '最高价': safe_float(realtime_data[4]),
-                    '最低价': safe_float(realtime_data[5]),
-                    '成交量': safe_int(realtime_data[8]),
-                    '成交额': safe_float(realtime_data[9]),
-                    '涨跌额': change,
-                    '涨跌幅': f"{change_pct:.2f}%",
-                    '数据来源': '新浪财经',
-                    '数据时间戳': datetime.datetime.now().isoformat()
-                }
+                quote = FinancialQuote(
+                    code=stock_code,
+                    source='新浪财经',
+                    change=change,
+                    change_percent=change_pct,
+                    turnover_rate=None,
+                    pe=None,
+                    pb=None,
+                    total_market_cap=None,
+                    float_market_cap=None,
+                    exchange_time=exchange_timestamp(f"{realtime_data[30]} {realtime_data[31]}", SINA_TIME_FORMAT),
+                    fetched_at=time.time(),
+                    **fields,
+                )
 
                 # 2. 尝试获取财务指标数据（如果可用）
                 try:
@@ -206,29 +305,21 @@ class FinancialDataFetcher:
                         'symbol': stock_code
                     }
 
-                    finance_response = requests.get(finance_url, params=finance_params, headers=sina_headers, timeout=5)
+                    finance_response = self.transport.get(finance_url, params=finance_params, headers=sina_headers, timeout=5)
 
                     if finance_response.status_code == 200:
                         finance_data = finance_response.json()
                         if finance_data and len(finance_data) > 0:
                             stock_info = finance_data[0]
 
-                            # 添加财务指标，修复单位问题
-                            financial_data.update({
-                                '市盈率(动态)': safe_float(stock_info.get('per', 0)) if safe_float(
-                                    stock_info.get('per', 0)) > 0 else "N/A",
-                                '市净率': safe_float(stock_info.get('pb', 0)),
-                                '总市值': f"{safe_float(stock_info.get('mktcap', 0)) / 10000:.2f}亿" if safe_float(
-                                    stock_info.get('mktcap', 0)) > 0 else "0",  # 修复：新浪财经总市值单位是万元，需要转换为亿元
-                                '流通市值': f"{safe_float(stock_info.get('nmc', 0)) / 10000:.2f}亿" if safe_float(
-                                    stock_info.get('nmc', 0)) > 0 else "0",  # 修复：新浪财经流通市值单位是万元，需要转换为亿元
-                                '换手率': f"{safe_float(stock_info.get('turnoverratio', 0)):.2f}%"
-                            })
+                            # 添加财务指标，新浪财经市值单位是万元，转换为元
+                            for name, value in SINA_FINANCE_FIELDS.parse(stock_info).items():
+                                setattr(quote, name, value)
                 except Exception as e:
                     # 如果财务数据获取失败，继续使用实时行情数据
                     print(f"新浪财经财务指标获取失败，使用实时行情数据: {e}")
 
-                return financial_data
+                return quote
                 
             return None
 
@@ -236,11 +327,51 @@ class FinancialDataFetcher:
             print(f"获取新浪财经财务数据失败: {e}")
             return None
 
+    def get_sina_financial_snapshot(self, stock_codes: List[str],
+                                    batch_size: int = None) -> Optional[pd.DataFrame]:
+        """
+        通过新浪 hq.sinajs.cn/list 批量获取行情快照，返回以股票代码为索引的列式表（原始数值）
+        新浪行情接口不提供换手率、市盈率、市净率和市值，这些列为 NaN
+        """
+        if batch_size is None:
+            batch_size = self.SINA_BATCH_SIZE
+
+        sina_headers = self.headers.copy()
+        sina_headers['Referer'] = 'http://finance.sina.com.cn'
+
+        codes, records = [], []
+        for text in fetch_sina_texts(self.transport, stock_codes, sina_headers, batch_size):
+            for stock_code, stock_data in iter_sina_records(text):
+                if len(stock_data) >= 32:
+                    codes.append(stock_code)
+                    records.append(stock_data)
+        if not records:
+            return None
+
+        fetched_at = time.time()
+        df = pd.DataFrame(SINA_FIELDS.parse_many(records), index=pd.Index(codes, name='code'))
+        df['change'] = df['price'] - df['pre_close']
+        pre_close = df['pre_close'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['change_percent'] = np.where(pre_close > 0, df['change'].to_numpy() / pre_close * 100, 0.0)
+        for field in ('turnover_rate', 'pe', 'pb', 'total_market_cap', 'float_market_cap'):
+            df[field] = np.nan
+        df['source'] = '新浪财经'
+        df['fetched_at'] = fetched_at
+        # 字段[30]、[31]为行情日期和时间
+        df['exchange_time'] = parse_exchange_times((f"{r[30]} {r[31]}" for r in records), SINA_TIME_FORMAT)
+        return df[[field for field in FinancialQuote.__slots__ if field != 'code']]
+
     def get_eastmoney_financial_data_fixed(self, stock_code: str) -> Optional[Dict]:
         """
         从东方财富获取财务数据 - 修复版本
         修复了价格字段获取问题
         """
+        quote = self.get_eastmoney_financial_quote(stock_code)
+        return quote.to_dict() if quote is not None else None
+
+    def get_eastmoney_financial_quote(self, stock_code: str) -> Optional[FinancialQuote]:
+        """从东方财富获取财务快照，返回原始数值的 FinancialQuote"""
         try:
             # 构建股票ID
             if stock_code.startswith('sz'):
@@ -266,87 +397,127 @@ class FinancialDataFetcher:
                 'wbp2u': '|0|0|0|web'
             }
 
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
 
             if response.status_code == 200:
                 data = response.json()
                 if data.get('data'):
                     stock_data = data['data']
 
-                    def safe_float(value, default=0):
-                        try:
-                            return float(value) if value and value != '' else default
-                        except (ValueError, TypeError):
-                            return default
-
-                    def format_market_cap(value):
-                        """格式化市值显示"""
-                        try:
-                            val = float(value)
-                            if val >= 100000000:  # 大于1亿
-                                return f"{val / 100000000:.2f}亿"
-                            elif val >= 10000:  # 大于1万
-                                return f"{val / 10000:.2f}万"
-                            else:
-                                return f"{val:,.0f}"
-                        except:
-                            return "0"
-
-                    financial_data = {
-                        '股票代码': stock_code,
-                        '股票名称': stock_data.get('f58', ''),
-                        '当前价格': safe_float(stock_data.get('f44', 0)),
-                        '昨收价': safe_float(stock_data.get('f48', 0)),
-                        '开盘价': safe_float(stock_data.get('f47', 0)),
-                        '最高价': safe_float(stock_data.get('f45', 0)),
-                        '最低价': safe_float(stock_data.get('f46', 0)),
-                        '成交量': safe_float(stock_data.get('f51', 0)),
-                        '成交额': safe_float(stock_data.get('f52', 0)),
-                        '换手率': f"{safe_float(stock_data.get('f168', 0)):.2f}%" if safe_float(
-                            stock_data.get('f168', 0)) > 0 else '-',  # 修正：使用f168字段获取换手率
-                        '市盈率(动态)': f"{safe_float(stock_data.get('f57', 0)):.2f}" if safe_float(
-                            stock_data.get('f57', 0)) != 0 else "N/A",
-                        '市净率': safe_float(stock_data.get('f127', 0)),
-                        '总市值': format_market_cap(stock_data.get('f116', 0)),  # 使用f116字段获取总市值
-                        '流通市值': format_market_cap(stock_data.get('f117', 0)),  # 使用f117字段获取流通市值
-                        '涨跌额': safe_float(stock_data.get('f49', 0)),
-                        '涨跌幅': f"{safe_float(stock_data.get('f50', 0)):.2f}%" if safe_float(
-                            stock_data.get('f50', 0)) != 0 else '-',
-                        '数据来源': '东方财富',
-                        '数据时间戳': datetime.datetime.now().isoformat()
-                    }
-
-                    return financial_data
+                    return FinancialQuote(
+                        code=stock_code,
+                        source='东方财富',
+                        fetched_at=time.time(),
+                        **EASTMONEY_FIELDS.parse(stock_data),
+                    )
             return None
 
         except Exception as e:
             print(f"获取东方财富财务数据失败: {e}")
             return None
 
+    def get_eastmoney_financial_snapshot(self, stock_codes: List[str],
+                                         batch_size: int = ULIST_BATCH_SIZE) -> Optional[pd.DataFrame]:
+        """
+        通过东方财富 ulist 接口批量获取财务快照，单次请求可带数百只股票
+        返回以股票代码为索引的列式表（原始数值），列与 get_tencent_financial_snapshot 一致
+        """
+        codes, records = fetch_ulist(self.transport, stock_codes, self.headers, batch_size)
+        if not records:
+            return None
+
+        fetched_at = time.time()
+        df = pd.DataFrame(ULIST_FIELDS.parse_many(records), index=pd.Index(codes, name='code'))
+        df['source'] = '东方财富'
+        df['fetched_at'] = fetched_at
+        return df[[field for field in FinancialQuote.__slots__ if field != 'code']]
+
+    def get_consensus_snapshot(self, stock_codes: List[str],
+                               max_staleness: float = 60.0) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        并发批量请求东方财富、新浪财经、腾讯财经，合并为一份共识快照
+        各数据源同时请求，总耗时接近最慢的一次批量请求；
+        行情时间落后超过 max_staleness 秒的数据源记录和偏离其他数据源的字段值不参与合并
+        返回 (共识快照, 字段来源)，参见 quote_consensus.build_consensus；所有数据源都失败时返回 None
+        """
+        sources = [
+            ('东方财富', self.get_eastmoney_financial_snapshot),
+            ('新浪财经', self.get_sina_financial_snapshot),
+            ('腾讯财经', self.get_tencent_financial_snapshot)
+        ]
+
+        # 批量快照与单只股票请求的耗时、成功率差异很大，健康度单独统计
+        if self.health is not None:
+            sources = self.health.order('financial_snapshot', sources)
+
+        def timed_fetch(source_name, source_func):
+            started = time.time()
+            try:
+                df = source_func(stock_codes)
+            except Exception as e:
+                print(f"❌ 从 {source_name} 获取批量快照失败: {e}")
+                df = None
+            return df, time.time() - started
+
+        frames = {}
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = [(name, executor.submit(timed_fetch, name, func)) for name, func in sources]
+            for source_name, future in futures:
+                df, elapsed = future.result()
+                ok = df is not None and not df.empty
+                if self.health is not None:
+                    self.health.record('financial_snapshot', source_name, ok, elapsed)
+                if ok:
+                    frames[source_name] = df
+
+        if not frames:
+            print("❌ 所有数据源都无法获取数据")
+            return None
+
+        print(f"✅ 共识快照: {len(frames)}/{len(sources)} 个数据源返回数据 ({'、'.join(frames)})")
+        return build_consensus(frames, [name for name, _ in sources], stock_codes, max_staleness)
+
     def get_financial_data_fixed(self, stock_code: str, data_source: str = 'auto') -> Optional[Dict]:
         """
         获取财务数据 - 修复版本
-        data_source: 'auto' - 自动选择, 'eastmoney' - 东方财富, 'sina' - 新浪财经, 'tencent' - 腾讯财经
+        data_source: 'auto' - 自动选择, 'race' - 对冲竞速, 'eastmoney' - 东方财富, 'sina' - 新浪财经, 'tencent' - 腾讯财经
+        设置了快照缓存时，有效期内的重复调用直接返回缓存结果
         """
+        if self.cache is not None:
+            key = SnapshotCache.make_key(data_source, stock_code, 'financial')
+            return self.cache.get_or_fetch(key, lambda: self._fetch_financial_data(stock_code, data_source))
+        return self._fetch_financial_data(stock_code, data_source)
+
+    def _fetch_financial_data(self, stock_code: str, data_source: str) -> Optional[Dict]:
+        """按数据源从网络获取财务数据"""
         print(f"正在获取 {stock_code} 的财务数据（修复版本）...")
 
+        sources = [
+            ('东方财富', self.get_eastmoney_financial_data_fixed),
+            ('新浪财经', self.get_sina_financial_data_fixed),
+            ('腾讯财经', self.get_tencent_financial_data_fixed)
+        ]
+
+        if self.health is not None:
+            sources = self.health.order('financial', sources)
+
+        if data_source == 'race':
+            return self._race_sources('financial', sources, stock_code)
+
         if data_source == 'auto':
             # 自动选择数据源
-            sources = [
-                ('东方财富', self.get_eastmoney_financial_data_fixed),
-                ('新浪财经', self.get_sina_financial_data_fixed),
-                ('腾讯财经', self.get_tencent_financial_data_fixed)
-            ]
-
             for source_name, source_func in sources:
                 print(f"尝试从 {source_name} 获取数据...")
+                started = time.time()
                 data = source_func(stock_code)
+                if self.health is not None:
+                    self.health.record_result('financial', source_name, data, time.time() - started)
                 if data is not None:
                     print(f"✅ 成功从 {source_name} 获取到数据")
+                    self.last_source = source_name
                     return data
                 else:
                     print(f"❌ 从 {source_name} 获取数据失败")
-                    time.sleep(1)
 
             print("❌ 所有数据源都无法获取数据")
             return None
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享HTTP传输层
+为各数据获取器提供带连接池、重试退避、按主机超时以及按主机自适应限速和熔断的 requests.Session
+"""
+
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from .rate_limiter import HostRateLimiter
+except ImportError:
+    from rate_limiter import HostRateLimiter
+
+
+class HttpTransport:
+    # 各数据源主机的默认超时（秒），未列出的主机使用 default_timeout
+    DEFAULT_HOST_TIMEOUTS = {
+        'hq.sinajs.cn': 5,
+        'qt.gtimg.cn': 5,
+        'push2.eastmoney.com': 5,
+        'money.finance.sina.com.cn': 10,
+        'push2his.eastmoney.com': 10,
+        'ifzq.gtimg.cn': 10,
+        'query1.finance.yahoo.com': 10,
+    }
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 20,
+                 max_retries: int = 2,
+                 backoff_factor: float = 0.3,
+                 default_timeout: float = 10,
+                 host_timeouts: Optional[Dict[str, float]] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 host_overrides: Optional[Dict[str, str]] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 enable_rate_limit: bool = True):
+        """
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机连接池保持的最大连接数
+        max_retries: 连接错误及 5xx 的最大重试次数（429 不重试，交给限流器降低请求速率）
+        backoff_factor: 重试退避系数，第n次重试前等待 backoff_factor * 2^(n-1) 秒
+        default_timeout: 未配置主机的默认超时（秒）
+        host_timeouts: 按主机覆盖的超时配置
+        headers: 会话级默认请求头
+        host_overrides: 主机到替代地址的映射（如 {'hq.sinajs.cn': 'http://127.0.0.1:8000'}），
+                        用于将请求转发到本地测试服务器，超时仍按原主机配置
+        rate_limiter: 按主机的令牌桶限速与熔断器，多个传输层可共享同一实例
+        enable_rate_limit: 为 False 时不限速也不熔断（如本地基准测试）
+        """
+        self.default_timeout = default_timeout
+        self.host_overrides = dict(host_overrides or {})
+        if enable_rate_limit:
+            self.rate_limiter = rate_limiter or HostRateLimiter()
+        else:
+            self.rate_limiter = None
+        self.host_timeouts = dict(self.DEFAULT_HOST_TIMEOUTS)
+        if host_timeouts:
+            self.host_timeouts.update(host_timeouts)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def timeout_for(self, url: str) -> float:
+        """返回指定URL所在主机的超时时间"""
+        host = urlsplit(url).hostname or ''
+        return self.host_timeouts.get(host, self.default_timeout)
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        """
+        发送GET请求，复用会话中的连接
+        timeout 为 None 时使用按主机配置的超时
+        主机处于熔断状态时抛出 CircuitOpenError（requests 的 ConnectionError 子类）
+        """
+        host = urlsplit(url).hostname or ''
+        if timeout is None:
+            timeout = self.host_timeouts.get(host, self.default_timeout)
+        if self.host_overrides:
+            url = self._override_url(url)
+        if self.rate_limiter is None:
+            return self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+        self.rate_limiter.before_request(host)
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        except Exception as e:
+            # 任何异常都要交给限流器，否则半开状态的熔断器会一直等待试探请求的结果
+            self.rate_limiter.after_error(host, e)
+            raise
+        self.rate_limiter.after_response(host, response)
+        return response
+
+    def _override_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        base = self.host_overrides.get(parts.hostname or '')
+        if base is None:
+            return url
+        base_parts = urlsplit(base)
+        return urlunsplit((base_parts.scheme, base_parts.netloc, parts.path, parts.query, parts.fragment))
+
+    def close(self):
+        """关闭会话并释放连接池"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
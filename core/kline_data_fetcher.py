@@ -5,7 +5,7 @@
 支持多种数据源获取90日K线数据
 """
 
-import requests
+import numpy as np
 import pandas as pd
 import time
 import datetime
@@ -13,8 +13,38 @@ import json
 import os
 from typing import List, Dict, Optional
 
-class KlineDataFetcher:
-    def __init__(self):
+try:
+    from .http_transport import HttpTransport
+    from .source_race import MultiSourceFetcher, SourceRacer
+    from .source_health import SourceHealthTracker
+    from .kline_parsers import (parse_eastmoney_klines, parse_sina_klines, build_ohlcv_frame,
+                                EASTMONEY_DAILY_FORMAT, SINA_DAILY_FORMAT)
+    from .kline_store import KlineStore
+    from .columnar_io import extension_for, write_columnar
+    from .partitioned_store import PartitionedKlineWriter
+    from .minute_resampler import resample_daily_bars, check_daily_consistency, infer_volume_units
+except ImportError:
+    from http_transport import HttpTransport
+    from source_race import MultiSourceFetcher, SourceRacer
+    from source_health import SourceHealthTracker
+    from kline_parsers import (parse_eastmoney_klines, parse_sina_klines, build_ohlcv_frame,
+                               EASTMONEY_DAILY_FORMAT, SINA_DAILY_FORMAT)
+    from kline_store import KlineStore
+    from columnar_io import extension_for, write_columnar
+    from partitioned_store import PartitionedKlineWriter
+    from minute_resampler import resample_daily_bars, check_daily_consistency, infer_volume_units
+
+def _busdays_since(day: Optional[datetime.date]) -> int:
+    """day 至今天（含）的工作日数，day 为 None 时为0"""
+    if day is None:
+        return 0
+    return max(0, int(np.busday_count(day, datetime.date.today() + datetime.timedelta(days=1))))
+
+
+class KlineDataFetcher(MultiSourceFetcher):
+    def __init__(self, transport: Optional[HttpTransport] = None, racer: Optional[SourceRacer] = None,
+                 store: Optional[KlineStore] = None, minute_store: Optional[KlineStore] = None,
+                 health: Optional[SourceHealthTracker] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -22,11 +52,18 @@ class KlineDataFetcher:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive'
         }
+        self._init_sources(transport, racer, health)
+        # 本地K线仓库，设置后只增量获取仓库中缺失的最新K线
+        self.store = store
+        # 本地1分钟K线仓库（dataset='1min'，时间列为'时间'），设置后日K线之后缺少的最近交易日由其合成
+        self.minute_store = minute_store
     
-    def get_sina_kline_data(self, stock_code: str, days: int = 90) -> Optional[pd.DataFrame]:
+    def get_sina_kline_data(self, stock_code: str, days: int = 90,
+                            before: Optional[datetime.date] = None) -> Optional[pd.DataFrame]:
         """
         从新浪财经获取K线数据
         注意：新浪财经的K线API需要特殊处理
+        before: 只返回该日期之前的K线；接口不支持截止日期，按期间的工作日数多取后在本地过滤
         """
         try:
             # 新浪财经K线数据API
@@ -36,37 +73,18 @@ class KlineDataFetcher:
                 'symbol': stock_code,
                 'scale': 240,  # 日K线
                 'ma': 5,       # 5日均线
-                'datalen': days
+                'datalen': days + _busdays_since(before)
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data:
-                    # 动态处理列名，因为新浪API返回的列数可能不同
-                    df = pd.DataFrame(data)
-                    
-                    # 根据实际列数动态设置列名
-                    if len(df.columns) == 6:
-                        df.columns = ['日期', '开盘价', '最高价', '最低价', '收盘价', '成交量']
-                    elif len(df.columns) == 8:
-                        df.columns = ['日期', '开盘价', '最高价', '最低价', '收盘价', '成交量', '成交额', '换手率']
-                    else:
-                        # 如果列数不匹配，使用通用列名
-                        df.columns = [f'col_{i}' for i in range(len(df.columns))]
-                        # 只保留前6列作为标准K线数据
-                        df = df.iloc[:, :6]
-                        df.columns = ['日期', '开盘价', '最高价', '最低价', '收盘价', '成交量']
-                    
-                    # 转换数据类型
-                    for col in ['开盘价', '最高价', '最低价', '收盘价', '成交量']:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce')
-                    
-                    # 按日期排序
-                    df['日期'] = pd.to_datetime(df['日期'])
-                    df = df.sort_values('日期')
+                    # 按字段名构造标准OHLCV格式（均线字段不输出）
+                    df = parse_sina_klines(data, time_column='日期', time_format=SINA_DAILY_FORMAT)
+                    if before is not None:
+                        df = df[df['日期'] < pd.Timestamp(before)]
                     
                     # 只保留最近90天的数据
                     df = df.tail(days)
@@ -78,9 +96,11 @@ class KlineDataFetcher:
             print(f"获取新浪K线数据失败: {e}")
             return None
     
-    def get_eastmoney_kline_data(self, stock_code: str, days: int = 90) -> Optional[pd.DataFrame]:
+    def get_eastmoney_kline_data(self, stock_code: str, days: int = 90,
+                                 before: Optional[datetime.date] = None) -> Optional[pd.DataFrame]:
         """
         从东方财富获取K线数据（备用方案）
+        before: 只返回该日期之前的K线
         """
         try:
             # 东方财富K线数据API
@@ -92,37 +112,20 @@ class KlineDataFetcher:
                 'klt': 101,  # 日K线
                 'fqt': 0,    # 不复权
                 'beg': 0,
-                'end': 20500101,
+                'end': (before - datetime.timedelta(days=1)).strftime('%Y%m%d') if before else 20500101,
                 'smplmt': days,
                 'lmt': days
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('data') and data['data'].get('klines'):
-                    klines = data['data']['klines']
-                    rows = []
-                    for line in klines:
-                        parts = line.split(',')
-                        rows.append({
-                            '日期': parts[0],
-                            '开盘价': float(parts[1]),
-                            '收盘价': float(parts[2]),
-                            '最高价': float(parts[3]),
-                            '最低价': float(parts[4]),
-                            '成交量': float(parts[5]),
-                            '成交额': float(parts[6]),
-                            '振幅': float(parts[7]),
-                            '涨跌幅': float(parts[8]),
-                            '涨跌额': float(parts[9]),
-                            '换手率': float(parts[10])
-                        })
-                    
-                    df = pd.DataFrame(rows)
-                    df['日期'] = pd.to_datetime(df['日期'])
-                    df = df.sort_values('日期')
+                    df = parse_eastmoney_klines(data['data']['klines'], time_column='日期',
+                                                time_format=EASTMONEY_DAILY_FORMAT)
+                    if before is not None:
+                        df = df[df['日期'] < pd.Timestamp(before)].reset_index(drop=True)
                     
                     return df
             return None
@@ -131,9 +134,11 @@ class KlineDataFetcher:
             print(f"获取东方财富K线数据失败: {e}")
             return None
     
-    def get_yahoo_kline_data(self, stock_code: str, days: int = 90) -> Optional[pd.DataFrame]:
+    def get_yahoo_kline_data(self, stock_code: str, days: int = 90,
+                             before: Optional[datetime.date] = None) -> Optional[pd.DataFrame]:
         """
         从Yahoo Finance获取K线数据（国际股票）
+        before: 只返回该日期之前的K线
         """
         try:
             # 转换股票代码格式
@@ -145,7 +150,7 @@ class KlineDataFetcher:
                 yahoo_code = stock_code
             
             # 计算日期范围
-            end_date = datetime.datetime.now()
+            end_date = datetime.datetime.combine(before, datetime.time()) if before else datetime.datetime.now()
             start_date = end_date - datetime.timedelta(days=days + 30)  # 多取30天确保有足够数据
             
             url = "https://query1.finance.yahoo.com/v8/finance/chart/" + yahoo_code
@@ -156,7 +161,7 @@ class KlineDataFetcher:
                 'events': 'history'
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -165,19 +170,20 @@ class KlineDataFetcher:
                     timestamps = result['timestamp']
                     quotes = result['indicators']['quote'][0]
                     
-                    rows = []
-                    for i, timestamp in enumerate(timestamps):
-                        rows.append({
-                            '日期': datetime.datetime.fromtimestamp(timestamp),
-                            '开盘价': quotes['open'][i] if quotes['open'][i] else None,
-                            '最高价': quotes['high'][i] if quotes['high'][i] else None,
-                            '最低价': quotes['low'][i] if quotes['low'][i] else None,
-                            '收盘价': quotes['close'][i] if quotes['close'][i] else None,
-                            '成交量': quotes['volume'][i] if quotes['volume'][i] else None
-                        })
-                    
-                    df = pd.DataFrame(rows)
+                    # 时间戳为开盘时刻，按北京时间取交易日
+                    dates = (pd.to_datetime(timestamps, unit='s', utc=True)
+                               .tz_convert('Asia/Shanghai').tz_localize(None).normalize())
+                    columns = {
+                        '开盘价': quotes['open'],
+                        '最高价': quotes['high'],
+                        '最低价': quotes['low'],
+                        '收盘价': quotes['close'],
+                        '成交量': quotes['volume'],
+                    }
+                    df = build_ohlcv_frame(dates, columns, time_column='日期')
                     df = df.dropna()  # 删除空值
+                    if before is not None:
+                        df = df[df['日期'] < pd.Timestamp(before)]
                     df = df.tail(days)  # 只保留最近90天
                     
                     return df
@@ -190,37 +196,240 @@ class KlineDataFetcher:
     def get_kline_data(self, stock_code: str, days: int = 90, data_source: str = 'auto') -> Optional[pd.DataFrame]:
         """
         获取K线数据的主函数
-        data_source: 'sina', 'eastmoney', 'yahoo', 'auto'
+        data_source: 'sina', 'eastmoney', 'yahoo', 'auto', 'race'
+        race 模式立即请求首选数据源，超过对冲延迟未返回时并行请求下一个数据源
+        设置了本地仓库时只下载仓库中最后一个交易日之后的K线并合并保存
+        设置了分钟K线仓库时，本地仓库或网络日K线之后缺少的最近交易日由已缓存的1分钟K线合成补齐
         """
         print(f"正在获取 {stock_code} 的 {days} 日K线数据...")
-        
+
+        if self.minute_store is not None:
+            return self._get_kline_data_with_minutes(stock_code, days, data_source)
+        return self._get_kline_data_network(stock_code, days, data_source)
+
+    def _get_kline_data_network(self, stock_code: str, days: int, data_source: str) -> Optional[pd.DataFrame]:
+        if self.store is not None:
+            return self._get_kline_data_incremental(stock_code, days, data_source)
+        return self._fetch_kline_data(stock_code, days, data_source)
+
+    def get_daily_from_minutes(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """由分钟K线仓库中已收盘交易日的1分钟K线合成日K线，没有缓存时返回 None"""
+        if self.minute_store is None:
+            return None
+        minute_df = self.minute_store.load(stock_code)
+        if minute_df is None or minute_df.empty:
+            return None
+        daily = resample_daily_bars(minute_df, time_column=self.minute_store.time_column, date_column='日期')
+        return daily if not daily.empty else None
+
+    def _get_kline_data_with_minutes(self, stock_code: str, days: int, data_source: str) -> Optional[pd.DataFrame]:
+        """
+        最近的日K线由分钟K线合成，网络只获取合成首日之前的更早历史；
+        本地仓库或网络的日K线保持不变，只在其最新日期之后追加合成的交易日。
+        本地仓库加上合成数据已足够时不访问网络；合成数据未覆盖到上一个交易日或无法衔接时回退为获取完整窗口
+        """
+        synthesized = self.get_daily_from_minutes(stock_code)
+        if synthesized is None:
+            return self._get_kline_data_network(stock_code, days, data_source)
+
+        previous_day = np.busday_offset(datetime.date.today(), -1, roll='forward').astype(datetime.date)
+        if synthesized['日期'].max().date() < previous_day:
+            print(f"⚠️ 分钟K线缓存只到 {synthesized['日期'].max().date()}，获取完整日K线窗口")
+            return self._append_to_network(stock_code, days, data_source, synthesized)
+
+        if self.store is not None:
+            stored = self.store.load(stock_code)
+            if stored is not None and not stored.empty:
+                combined = self._append_synthesized(stored, synthesized)
+                if len(combined) >= days and combined['日期'].max() >= synthesized['日期'].max():
+                    return combined.tail(days).reset_index(drop=True)
+            # 本地仓库不足时由增量获取补齐并更新仓库
+            return self._append_to_network(stock_code, days, data_source, synthesized)
+
+        synthesized = synthesized.tail(days).reset_index(drop=True)
+        if len(synthesized) >= days:
+            self.last_source = '分钟K线合成'
+            return synthesized
+
+        # 只获取合成首日及之前的K线；多取的首日用于与合成数据比对成交量单位
+        first_date = synthesized['日期'].iloc[0].date()
+        older = self._fetch_kline_data(stock_code, days - len(synthesized) + 1, data_source,
+                                       before=first_date + datetime.timedelta(days=1))
+        if older is not None and not older.empty:
+            combined = self._append_synthesized(older, synthesized)
+            if combined['日期'].max() == synthesized['日期'].max():
+                print(f"网络获取 {len(older)} 条 {first_date} 及之前的历史K线")
+                return combined.tail(days).reset_index(drop=True)
+        print("⚠️ 更早的历史K线无法与合成数据衔接，获取完整日K线窗口")
+        return self._append_to_network(stock_code, days, data_source, synthesized)
+
+    def _append_to_network(self, stock_code: str, days: int, data_source: str,
+                           synthesized: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """获取完整窗口的日K线（本地仓库或网络），并追加其后由分钟K线合成的交易日"""
+        history = self._get_kline_data_network(stock_code, days, data_source)
+        if history is None or history.empty:
+            print("⚠️ 无法获取日K线，只返回由分钟K线合成的数据")
+            return synthesized.tail(days).reset_index(drop=True)
+        return self._append_synthesized(history, synthesized).tail(days).reset_index(drop=True)
+
+    def _append_synthesized(self, history: pd.DataFrame, synthesized: pd.DataFrame) -> pd.DataFrame:
+        """
+        在 history 之后追加合成日K线中日期更晚、且从 history 最新日期起逐个工作日衔接的交易日
+        （遇到缺口即停止；节假日也视为缺口，此时交由网络补齐），成交量换算为 history 的单位
+        """
+        last_date = history['日期'].max()
+        newer = synthesized[synthesized['日期'] > last_date]
+        if newer.empty:
+            return history
+
+        dates = newer['日期'].to_numpy(dtype='datetime64[D]')
+        previous = np.concatenate([[np.datetime64(last_date.date())], dates[:-1]])
+        gaps = np.busday_count(previous, dates) != 1
+        joined = int(np.argmax(gaps)) if gaps.any() else len(dates)
+        if joined == 0:
+            print(f"⚠️ 分钟K线缓存与日K线未衔接（日K线最新 {last_date.date()}，"
+                  f"合成数据最早 {newer['日期'].iloc[0].date()}），不使用合成数据")
+            return history
+        newer = self._align_volume_units(newer.iloc[:joined], history, synthesized)
+        if newer is None:
+            return history
+
+        print(f"由分钟K线合成 {len(newer)} 条日K线 ({newer['日期'].iloc[0].date()} 起)")
+        columns = [col for col in newer.columns if col in history.columns]
+        return pd.concat([history, newer[columns]], ignore_index=True)
+
+    @staticmethod
+    def _align_volume_units(newer: pd.DataFrame, history: pd.DataFrame,
+                            synthesized: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        将待追加的合成日K线成交量换算为 history 的单位（股或手）
+        两边都有成交额时逐行按成交额推断单位，否则按两者重叠交易日的成交量比值推断；
+        都无法推断时返回 None
+        """
+        history_units = infer_volume_units(history.tail(20))
+        history_units = history_units[~np.isnan(history_units)]
+        newer_units = infer_volume_units(newer)
+        if history_units.size and not np.isnan(newer_units).any():
+            factor = newer_units / history_units[-1]
+        else:
+            overlap = synthesized.merge(history, on='日期', suffixes=('_合成', ''))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratios = (overlap['成交量'] / overlap['成交量_合成']).to_numpy(dtype=np.float64)
+            ratios = ratios[np.isfinite(ratios) & (ratios > 0)]
+            ratio = float(np.median(ratios)) if ratios.size else np.nan
+            factor = next((unit for unit in (1.0, 100.0, 0.01) if abs(ratio / unit - 1) <= 0.1), None)
+            if factor is None:
+                print("⚠️ 无法确定分钟K线与日K线的成交量单位（缺少成交额且没有可比较的交易日），不使用合成数据")
+                return None
+
+        newer = newer.copy()
+        newer['成交量'] = newer['成交量'] * factor
+        return newer
+
+    def check_minute_synthesis(self, stock_code: str, data_source: str = 'auto') -> Optional[pd.DataFrame]:
+        """
+        将分钟K线合成的日K线与数据源日K线逐日比较
+        返回比较结果（见 check_daily_consistency），没有分钟缓存或数据源获取失败时返回 None
+        """
+        synthesized = self.get_daily_from_minutes(stock_code)
+        if synthesized is None:
+            print(f"❌ {stock_code} 没有可用于合成的分钟K线缓存")
+            return None
+
+        # 按合成数据首日至今的工作日数获取，保证覆盖全部合成交易日
+        first_date = synthesized['日期'].iloc[0].date()
+        fetch_days = max(len(synthesized), int(np.busday_count(first_date, datetime.date.today()))) + 1
+        source = self._fetch_kline_data(stock_code, fetch_days, data_source)
+        if source is None or source.empty:
+            return None
+
+        report = check_daily_consistency(synthesized, source)
+        if report.empty:
+            print(f"❌ {stock_code} 合成日K线与数据源日K线没有相同的交易日，无法比较")
+            return None
+        mismatched = report[~report['一致']]
+        if mismatched.empty:
+            print(f"✅ {stock_code} 合成日K线与数据源一致 ({len(report)} 个交易日)")
+        else:
+            print(f"⚠️ {stock_code} 有 {len(mismatched)}/{len(report)} 个交易日不一致:")
+            print(mismatched.to_string(index=False))
+        return report
+
+    def _get_kline_data_incremental(self, stock_code: str, days: int, data_source: str) -> Optional[pd.DataFrame]:
+        """从本地仓库读取历史K线，只从网络获取缺失的尾部数据"""
+        stored = self.store.load(stock_code)
+
+        if stored is None or len(stored) < days:
+            # 仓库中没有足够的历史数据，下载完整窗口
+            fetch_days = days
+        else:
+            last_date = stored['日期'].max().date()
+            today = datetime.date.today()
+            # 自上次保存以来的交易日数（按工作日估算），包含仓库中最后一天以覆盖可能未收盘的K线
+            # 获取整个缺口（即使超过 days），保证合并后仓库中的K线连续
+            fetch_days = int(np.busday_count(last_date, today + datetime.timedelta(days=1)))
+            print(f"本地仓库已有 {len(stored)} 条数据，最新日期 {last_date}，增量获取 {fetch_days} 条")
+
+        new_df = self._fetch_kline_data(stock_code, fetch_days, data_source)
+        if new_df is None or new_df.empty:
+            if stored is None or stored.empty:
+                return None
+            print("⚠️ 增量获取失败，返回本地仓库中的数据")
+            return stored.tail(days).reset_index(drop=True)
+
+        first_new = pd.to_datetime(new_df['日期']).min()
+        if stored is not None and not stored.empty and first_new > stored['日期'].max():
+            # 数据源返回的条数少于请求（如单次请求上限），新数据与仓库之间有缺口：
+            # 不写入仓库，以免仓库中出现断档或丢失已保存的历史，下次调用会重新获取缺口
+            print(f"⚠️ 增量数据未与本地仓库衔接（仓库最新 {stored['日期'].max().date()}，"
+                  f"新数据最早 {first_new.date()}），本次结果不写入本地仓库")
+            fresh = new_df.copy()
+            fresh['日期'] = pd.to_datetime(fresh['日期'])
+            combined = pd.concat([stored, fresh], ignore_index=True)
+            return combined.tail(days).reset_index(drop=True)
+
+        merged = self.store.merge(stock_code, new_df)
+        return merged.tail(days).reset_index(drop=True)
+
+    def _fetch_kline_data(self, stock_code: str, days: int, data_source: str,
+                          before: Optional[datetime.date] = None) -> Optional[pd.DataFrame]:
+        """按数据源从网络获取K线数据，before 不为 None 时只获取该日期之前的K线"""
+        sources = [
+            ('新浪财经', self.get_sina_kline_data),
+            ('东方财富', self.get_eastmoney_kline_data),
+            ('Yahoo Finance', self.get_yahoo_kline_data)
+        ]
+
+        if self.health is not None:
+            sources = self.health.order('kline', sources)
+
+        if data_source == 'race':
+            return self._race_sources('kline', sources, stock_code, days, before)
+
         if data_source == 'auto':
             # 自动选择数据源
-            sources = [
-                ('新浪财经', self.get_sina_kline_data),
-                ('东方财富', self.get_eastmoney_kline_data),
-                ('Yahoo Finance', self.get_yahoo_kline_data)
-            ]
-            
             for source_name, source_func in sources:
                 print(f"尝试从 {source_name} 获取数据...")
-                df = source_func(stock_code, days)
+                started = time.time()
+                df = source_func(stock_code, days, before)
+                if self.health is not None:
+                    self.health.record_result('kline', source_name, df, time.time() - started)
                 if df is not None and not df.empty:
                     print(f"✅ 成功从 {source_name} 获取到 {len(df)} 条数据")
+                    self.last_source = source_name
                     return df
                 else:
                     print(f"❌ 从 {source_name} 获取数据失败")
-                    time.sleep(1)  # 避免请求过于频繁
             
             print("❌ 所有数据源都无法获取数据")
             return None
             
         elif data_source == 'sina':
-            return self.get_sina_kline_data(stock_code, days)
+            return self.get_sina_kline_data(stock_code, days, before)
         elif data_source == 'eastmoney':
-            return self.get_eastmoney_kline_data(stock_code, days)
+            return self.get_eastmoney_kline_data(stock_code, days, before)
         elif data_source == 'yahoo':
-            return self.get_yahoo_kline_data(stock_code, days)
+            return self.get_yahoo_kline_data(stock_code, days, before)
         else:
             print(f"❌ 不支持的数据源: {data_source}")
             return None
@@ -232,7 +441,30 @@ class KlineDataFetcher:
         
         df.to_csv(filename, index=False, encoding='utf-8-sig')
         print(f"✅ 数据已保存到: {filename}")
+
+    def save_to_columnar(self, df: pd.DataFrame, stock_code: str, filename: str = None, fmt: str = 'parquet'):
+        """
+        保存数据到列式文件（保留数值和时间类型，体积小、加载快）
+        fmt: 'parquet'、'feather' 或 'npz'，未安装 pyarrow 时回退为 npz；读取使用 columnar_io.read_columnar
+        """
+        if filename is None:
+            filename = f"{stock_code}_kline_data_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}{extension_for(fmt)}"
+
+        write_columnar(df, filename)
+        print(f"✅ 数据已保存到: {filename}")
     
+    def save_partitioned(self, df: pd.DataFrame, stock_code: str,
+                         root_dir: str = 'data', fmt: str = 'parquet') -> int:
+        """
+        追加保存到按 股票/周期/年月 分区的仓库，只写入新增或被修正的K线
+        与按时间戳命名的一次性文件不同，重复保存不会产生重复数据；读取使用 PartitionedKlineWriter.read
+        返回改写的分区数
+        """
+        writer = PartitionedKlineWriter(root_dir, time_column='日期', fmt=fmt)
+        written = writer.append(stock_code, 'daily', df)
+        print(f"✅ 数据已追加到: {os.path.join(root_dir, stock_code, 'daily')} (改写 {written} 个分区)")
+        return written
+
     def save_to_json(self, df: pd.DataFrame, stock_code: str, filename: str = None):
         """保存数据到JSON文件"""
         if filename is None:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K线数据批量解析
+将数据源返回的K线文本一次性转换为带类型的DataFrame，避免逐行构造字典
+
+所有数据源统一输出以下结构（OHLCV标准格式）：
+  时间列（日K为'日期'，分钟K为'时间'，datetime64）
+  开盘价、最高价、最低价、收盘价、成交量（float64）
+  以及数据源提供的可选列：成交额、振幅、涨跌幅、涨跌额、换手率（float64）
+"""
+
+import warnings
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# OHLCV标准格式的必选列和可选列，按此顺序输出
+OHLCV_COLUMNS = ['开盘价', '最高价', '最低价', '收盘价', '成交量']
+OHLCV_OPTIONAL_COLUMNS = ['成交额', '振幅', '涨跌幅', '涨跌额', '换手率']
+
+# 东方财富 fields2=f51..f61 对应的列（f51 为时间列）
+EASTMONEY_KLINE_COLUMNS = ['开盘价', '收盘价', '最高价', '最低价', '成交量', '成交额',
+                           '振幅', '涨跌幅', '涨跌额', '换手率']
+
+EASTMONEY_DAILY_FORMAT = '%Y-%m-%d'
+EASTMONEY_MINUTE_FORMAT = '%Y-%m-%d %H:%M'
+SINA_DAILY_FORMAT = '%Y-%m-%d'
+SINA_MINUTE_FORMAT = '%Y-%m-%d %H:%M:%S'
+TENCENT_MINUTE_FORMAT = '%Y%m%d%H%M'
+
+
+def _to_float_array(values: Sequence, float_dtype: str) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float_dtype)
+    except (ValueError, TypeError):
+        # 含有空字符串等无法直接转换的值时按列容错转换
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float_dtype)
+
+
+def build_ohlcv_frame(times, columns: Dict[str, Sequence], time_column: str = '日期',
+                      time_format: Optional[str] = None, float_dtype: str = 'float64') -> pd.DataFrame:
+    """
+    按列构造OHLCV标准格式的DataFrame
+    times: 时间字符串序列（配合 time_format 解析）或已解析的时间序列
+    columns: 列名到数值序列的映射，须包含全部 OHLCV_COLUMNS
+    """
+    if time_format is not None:
+        times = pd.to_datetime(pd.Index(times), format=time_format)
+    data = {time_column: times}
+    for col in OHLCV_COLUMNS + [c for c in OHLCV_OPTIONAL_COLUMNS if c in columns]:
+        data[col] = _to_float_array(columns[col], float_dtype)
+
+    df = pd.DataFrame(data)
+    if not df[time_column].is_monotonic_increasing:
+        df = df.sort_values(time_column)
+    return df
+
+
+def parse_sina_klines(records: List[Dict], time_column: str = '日期',
+                      time_format: str = SINA_DAILY_FORMAT, float_dtype: str = 'float64') -> pd.DataFrame:
+    """
+    解析新浪 CN_MarketData.getKLineData 返回的记录列表
+    每条记录含 day/open/high/low/close/volume，均线字段（ma_price5 等）不输出
+    """
+    columns = {
+        '开盘价': [r['open'] for r in records],
+        '最高价': [r['high'] for r in records],
+        '最低价': [r['low'] for r in records],
+        '收盘价': [r['close'] for r in records],
+        '成交量': [r['volume'] for r in records],
+    }
+    return build_ohlcv_frame([r['day'] for r in records], columns, time_column, time_format, float_dtype)
+
+
+def parse_tencent_klines(klines: List[List], time_column: str = '时间',
+                         time_format: str = TENCENT_MINUTE_FORMAT, float_dtype: str = 'float64') -> pd.DataFrame:
+    """
+    解析腾讯 mkline 接口返回的K线列表
+    每行格式为 [时间, 开盘, 收盘, 最高, 最低, 成交量, ...]
+    """
+    times, opens, closes, highs, lows, volumes = zip(*(line[:6] for line in klines))
+    columns = {
+        '开盘价': opens,
+        '最高价': highs,
+        '最低价': lows,
+        '收盘价': closes,
+        '成交量': volumes,
+    }
+    return build_ohlcv_frame(times, columns, time_column, time_format, float_dtype)
+
+
+def parse_eastmoney_klines(klines: List[str], time_column: str = '日期',
+                           time_format: str = EASTMONEY_DAILY_FORMAT,
+                           float_dtype: str = 'float64') -> pd.DataFrame:
+    """
+    解析东方财富 kline 接口返回的 klines 列表
+    每行格式为 "时间,开盘,收盘,最高,最低,成交量,成交额,振幅,涨跌幅,涨跌额,换手率"
+    float_dtype: 数值列类型，大批量处理时可用 'float32' 减少内存
+    """
+    column_count = len(EASTMONEY_KLINE_COLUMNS)
+    times, _, rest = zip(*(line.partition(',') for line in klines))
+
+    # 所有数值字段拼接后一次性转换
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            values = np.fromstring(','.join(rest), dtype=float_dtype, sep=',')
+    except ValueError:
+        values = np.empty(0, dtype=float_dtype)
+
+    if values.size == len(klines) * column_count:
+        matrix = values.reshape(len(klines), column_count)
+        columns = {col: matrix[:, i] for i, col in enumerate(EASTMONEY_KLINE_COLUMNS)}
+    else:
+        # 存在非数字字段（如停牌时的 '-'）或列数不一致时，逐列容错转换
+        cells = [row.split(',')[:column_count] for row in rest]
+        columns = {col: [row[i] if i < len(row) else None for row in cells]
+                   for i, col in enumerate(EASTMONEY_KLINE_COLUMNS)}
+
+    return build_ohlcv_frame(times, columns, time_column, time_format, float_dtype)
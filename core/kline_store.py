@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地K线数据仓库
+每只股票保存为一个列式文件，新数据按时间列合并去重
+"""
+
+import os
+import threading
+from typing import Optional
+
+import pandas as pd
+
+try:
+    from .columnar_io import default_extension, find_columnar_file, read_columnar, write_columnar
+except ImportError:
+    from columnar_io import default_extension, find_columnar_file, read_columnar, write_columnar
+
+
+class KlineStore:
+    def __init__(self, root_dir: str, time_column: str = '日期', dataset: str = 'daily'):
+        """
+        root_dir: 数据仓库根目录
+        time_column: 用于排序和去重的时间列
+        dataset: 数据集名称（如 daily、1min），不同数据集存放在不同子目录
+        """
+        self.root_dir = root_dir
+        self.time_column = time_column
+        self.dataset = dataset
+        self._lock = threading.Lock()
+
+    def _base_path(self, stock_code: str) -> str:
+        return os.path.join(self.root_dir, self.dataset, stock_code)
+
+    def load(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """读取已保存的数据，不存在时返回 None"""
+        path = find_columnar_file(self._base_path(stock_code))
+        if path is None:
+            return None
+        df = read_columnar(path)
+        df[self.time_column] = pd.to_datetime(df[self.time_column])
+        return df
+
+    def last_timestamp(self, stock_code: str) -> Optional[pd.Timestamp]:
+        """返回已保存数据的最新时间"""
+        df = self.load(stock_code)
+        if df is None or df.empty:
+            return None
+        return df[self.time_column].max()
+
+    def save(self, stock_code: str, df: pd.DataFrame):
+        """覆盖保存一只股票的数据"""
+        base_path = self._base_path(stock_code)
+        path = find_columnar_file(base_path) or base_path + default_extension()
+        write_columnar(df.reset_index(drop=True), path)
+
+    def merge(self, stock_code: str, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        将新数据合并进已保存的数据并写回
+        时间相同的行以新数据为准（最后一根K线可能是盘中未完成的数据）
+        """
+        with self._lock:
+            stored = self.load(stock_code)
+            if stored is not None and not stored.empty:
+                merged = pd.concat([stored, new_df], ignore_index=True)
+            else:
+                merged = new_df.copy()
+            merged[self.time_column] = pd.to_datetime(merged[self.time_column])
+            merged = (merged.drop_duplicates(subset=self.time_column, keep='last')
+                            .sort_values(self.time_column)
+                            .reset_index(drop=True))
+            self.save(stock_code, merged)
+            return merged
@@ -9,14 +9,33 @@ import datetime
 import json
 import os
 import time
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
 import pandas as pd
-import requests
 
+try:
+    from .http_transport import HttpTransport
+    from .source_race import MultiSourceFetcher, SourceRacer
+    from .source_health import SourceHealthTracker
+    from .kline_parsers import (parse_eastmoney_klines, parse_sina_klines, parse_tencent_klines,
+                                EASTMONEY_MINUTE_FORMAT, SINA_MINUTE_FORMAT, TENCENT_MINUTE_FORMAT)
+    from .minute_resampler import resample_minute_bars, resample_minute_frames
+    from .columnar_io import extension_for, write_columnar
+    from .partitioned_store import PartitionedKlineWriter
+except ImportError:
+    from http_transport import HttpTransport
+    from source_race import MultiSourceFetcher, SourceRacer
+    from source_health import SourceHealthTracker
+    from kline_parsers import (parse_eastmoney_klines, parse_sina_klines, parse_tencent_klines,
+                               EASTMONEY_MINUTE_FORMAT, SINA_MINUTE_FORMAT, TENCENT_MINUTE_FORMAT)
+    from minute_resampler import resample_minute_bars, resample_minute_frames
+    from columnar_io import extension_for, write_columnar
+    from partitioned_store import PartitionedKlineWriter
 
-class MinuteDataFetcher:
-    def __init__(self):
+
+class MinuteDataFetcher(MultiSourceFetcher):
+    def __init__(self, transport: Optional[HttpTransport] = None, racer: Optional[SourceRacer] = None,
+                 health: Optional[SourceHealthTracker] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -24,6 +43,7 @@ class MinuteDataFetcher:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive'
         }
+        self._init_sources(transport, racer, health)
     
     def get_sina_minute_data(self, stock_code: str, period: int = 30) -> Optional[pd.DataFrame]:
         """
@@ -41,25 +61,13 @@ class MinuteDataFetcher:
                 'datalen': 1023   # 最大数据长度
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data:
-                    df = pd.DataFrame(data)
-                    
-                    # 根据实际列数动态设置列名
-                    if len(df.columns) >= 6:
-                        df.columns = ['时间', '开盘价', '最高价', '最低价', '收盘价', '成交量'] + list(df.columns[6:])
-                    
-                    # 转换数据类型
-                    for col in ['开盘价', '最高价', '最低价', '收盘价', '成交量']:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce')
-                    
-                    # 处理时间格式
-                    df['时间'] = pd.to_datetime(df['时间'])
-                    df = df.sort_values('时间')
+                    # 按字段名构造标准OHLCV格式（均线字段不输出）
+                    df = parse_sina_klines(data, time_column='时间', time_format=SINA_MINUTE_FORMAT)
                     
                     return df
             return None
@@ -93,32 +101,13 @@ class MinuteDataFetcher:
                 'lmt': 1023
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('data') and data['data'].get('klines'):
-                    klines = data['data']['klines']
-                    rows = []
-                    for line in klines:
-                        parts = line.split(',')
-                        rows.append({
-                            '时间': parts[0],
-                            '开盘价': float(parts[1]),
-                            '收盘价': float(parts[2]),
-                            '最高价': float(parts[3]),
-                            '最低价': float(parts[4]),
-                            '成交量': float(parts[5]),
-                            '成交额': float(parts[6]),
-                            '振幅': float(parts[7]),
-                            '涨跌幅': float(parts[8]),
-                            '涨跌额': float(parts[9]),
-                            '换手率': float(parts[10])
-                        })
-                    
-                    df = pd.DataFrame(rows)
-                    df['时间'] = pd.to_datetime(df['时间'])
-                    df = df.sort_values('时间')
+                    df = parse_eastmoney_klines(data['data']['klines'], time_column='时间',
+                                                time_format=EASTMONEY_MINUTE_FORMAT)
                     
                     return df
             return None
@@ -145,28 +134,15 @@ class MinuteDataFetcher:
                 '_': int(time.time() * 1000)
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('data') and data['data'].get(stock_code):
                     stock_data = data['data'][stock_code]
                     if stock_data.get(kline_type):
-                        klines = stock_data[kline_type]
-                        rows = []
-                        for line in klines:
-                            rows.append({
-                                '时间': line[0],
-                                '开盘价': float(line[1]),
-                                '收盘价': float(line[2]),
-                                '最高价': float(line[3]),
-                                '最低价': float(line[4]),
-                                '成交量': float(line[5])
-                            })
-                        
-                        df = pd.DataFrame(rows)
-                        df['时间'] = pd.to_datetime(df['时间'])
-                        df = df.sort_values('时间')
+                        df = parse_tencent_klines(stock_data[kline_type], time_column='时间',
+                                                  time_format=TENCENT_MINUTE_FORMAT)
                         
                         return df
             return None
@@ -179,23 +155,34 @@ class MinuteDataFetcher:
         """
         获取分钟级数据的主函数
         period: 分钟周期，支持1, 5, 15, 30, 60分钟
-        data_source: 'sina', 'eastmoney', 'tencent', 'auto'
+        data_source: 'sina', 'eastmoney', 'tencent', 'auto', 'race'
+        race 模式立即请求首选数据源，超过对冲延迟未返回时并行请求下一个数据源
         """
         print(f"正在获取 {stock_code} 的 {period} 分钟分时数据...")
         
+        sources = [
+            ('新浪财经', self.get_sina_minute_data),
+            ('东方财富', self.get_eastmoney_minute_data),
+            ('腾讯财经', self.get_tencent_minute_data)
+        ]
+
+        if self.health is not None:
+            sources = self.health.order('minute', sources)
+
+        if data_source == 'race':
+            return self._race_sources('minute', sources, stock_code, period)
+
         if data_source == 'auto':
             # 自动选择数据源
-            sources = [
-                ('新浪财经', self.get_sina_minute_data),
-                ('东方财富', self.get_eastmoney_minute_data),
-                ('腾讯财经', self.get_tencent_minute_data)
-            ]
-            
             for source_name, source_func in sources:
                 print(f"尝试从 {source_name} 获取数据...")
+                started = time.time()
                 df = source_func(stock_code, period)
+                if self.health is not None:
+                    self.health.record_result('minute', source_name, df, time.time() - started)
                 if df is not None and not df.empty:
                     print(f"✅ 成功从 {source_name} 获取到 {len(df)} 条数据")
+                    self.last_source = source_name
                     return df
                 else:
                     print(f"❌ 从 {source_name} 获取数据失败")
@@ -213,6 +200,27 @@ class MinuteDataFetcher:
             print(f"❌ 不支持的数据源: {data_source}")
             return None
     
+    def get_minute_data_multi(self, stock_code: str, periods: Iterable[int] = (1, 5, 15, 30, 60),
+                              data_source: str = 'auto') -> Optional[Dict[int, pd.DataFrame]]:
+        """
+        请求一次1分钟K线，在本地按交易时段合成多个周期的K线
+        返回 {周期: DataFrame}；1分钟数据最多1023条（约4个交易日），
+        需要更长历史的周期仍应单独调用 get_minute_data
+        """
+        df = self.get_minute_data(stock_code, 1, data_source)
+        if df is None or df.empty:
+            return None
+        return {period: resample_minute_bars(df, period) for period in periods}
+
+    def get_minute_data_multi_batch(self, stock_codes: List[str], periods: Iterable[int] = (1, 5, 15, 30, 60),
+                                    data_source: str = 'auto') -> Dict[int, Dict[str, pd.DataFrame]]:
+        """
+        批量获取多只股票的1分钟K线，并一次性合成多个周期
+        返回 {周期: {股票代码: DataFrame}}，获取失败的股票不包含在结果中
+        """
+        frames = {code: self.get_minute_data(code, 1, data_source) for code in stock_codes}
+        return resample_minute_frames(frames, periods)
+
     def save_to_csv(self, df: pd.DataFrame, stock_code: str, period: int, filename: str = None):
         """保存数据到CSV文件"""
         # 获取调用脚本所在目录的outputs子目录
@@ -242,6 +250,40 @@ class MinuteDataFetcher:
         df.to_csv(filepath, index=False, encoding='utf-8-sig')
         print(f"✅ 数据已保存到: {filepath}")
     
+    def save_to_columnar(self, df: pd.DataFrame, stock_code: str, period: int, filename: str = None,
+                         fmt: str = 'parquet'):
+        """
+        保存数据到列式文件（保留数值和时间类型，体积小、加载快）
+        fmt: 'parquet'、'feather' 或 'npz'，未安装 pyarrow 时回退为 npz；读取使用 columnar_io.read_columnar
+        """
+        # 获取调用脚本所在目录的outputs子目录
+        import inspect
+        caller_frame = inspect.currentframe().f_back
+        caller_file = caller_frame.f_globals.get('__file__') if caller_frame else None
+        if caller_file:
+            output_dir = os.path.join(os.path.dirname(os.path.abspath(caller_file)), "outputs")
+        else:
+            output_dir = os.path.join(os.getcwd(), "outputs")
+
+        if filename is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{stock_code}_{period}min_data_{timestamp}{extension_for(fmt)}"
+
+        filepath = write_columnar(df, os.path.join(output_dir, filename))
+        print(f"✅ 数据已保存到: {filepath}")
+
+    def save_partitioned(self, df: pd.DataFrame, stock_code: str, period: int,
+                         root_dir: str = 'data', fmt: str = 'parquet') -> int:
+        """
+        追加保存到按 股票/周期/年月 分区的仓库，只写入新增或被修正的K线
+        与按时间戳命名的一次性文件不同，重复保存不会产生重复数据；读取使用 PartitionedKlineWriter.read
+        返回改写的分区数
+        """
+        writer = PartitionedKlineWriter(root_dir, time_column='时间', fmt=fmt)
+        written = writer.append(stock_code, f'{period}min', df)
+        print(f"✅ 数据已追加到: {os.path.join(root_dir, stock_code, f'{period}min')} (改写 {written} 个分区)")
+        return written
+
     def save_to_json(self, df: pd.DataFrame, stock_code: str, period: int, filename: str = None):
         """保存数据到JSON文件"""
         # 获取调用脚本所在目录的outputs子目录
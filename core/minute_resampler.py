@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按A股交易时段合成分钟K线
+由1分钟K线在本地合成 5/15/30/60 分钟K线，只需请求一次最细粒度数据
+
+A股连续竞价时段为 09:30-11:30、13:00-15:00，每天共240分钟。
+K线以结束时间标记（如 09:35 的5分钟K线包含 09:31~09:35），
+周期均能整除上午的120分钟，因此合成的K线不会跨越午休。
+已收盘交易日的1分钟K线也可直接合成日K线，用于替代重复下载最近的日K线。
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# 可由1分钟K线合成的周期（须整除上午/下午各120分钟）
+SESSION_PERIODS = (1, 5, 15, 30, 60, 120)
+
+_MORNING_OPEN = 9 * 60 + 30    # 09:30
+_MORNING_CLOSE = 11 * 60 + 30  # 11:30
+_AFTERNOON_OPEN = 13 * 60      # 13:00
+_SESSION_MINUTES = 120
+
+# 合成时各列的聚合方式，未列出的列（振幅、涨跌幅等依赖前收盘的列）不输出
+_AGGREGATIONS = {
+    '开盘价': 'first',
+    '最高价': 'max',
+    '最低价': 'min',
+    '收盘价': 'last',
+    '成交量': 'sum',
+    '成交额': 'sum',
+    '换手率': 'sum',
+}
+
+
+def session_minute_index(times: pd.Series) -> np.ndarray:
+    """
+    计算每根1分钟K线在交易日内的序号（1~240）
+    09:30 的集合竞价K线并入第1分钟，13:00 的K线并入下午第1分钟
+    """
+    minutes = (times.dt.hour * 60 + times.dt.minute).to_numpy()
+    morning = np.maximum(minutes - _MORNING_OPEN, 1)
+    afternoon = np.maximum(minutes - _AFTERNOON_OPEN, 1) + _SESSION_MINUTES
+    index = np.where(minutes <= _MORNING_CLOSE, morning, afternoon)
+    return np.clip(index, 1, 2 * _SESSION_MINUTES)
+
+
+def session_bar_labels(times: pd.Series, period: int) -> pd.Series:
+    """返回每根1分钟K线所属 period 分钟K线的结束时间"""
+    index = session_minute_index(times)
+    end_index = ((index - 1) // period + 1) * period
+    end_minutes = np.where(end_index <= _SESSION_MINUTES,
+                           _MORNING_OPEN + end_index,
+                           _AFTERNOON_OPEN + end_index - _SESSION_MINUTES)
+    return times.dt.normalize() + pd.to_timedelta(end_minutes, unit='min')
+
+
+def resample_minute_bars(df: pd.DataFrame, period: int, time_column: str = '时间',
+                         symbol_column: str = None) -> pd.DataFrame:
+    """
+    将1分钟K线合成为 period 分钟K线
+    df: OHLCV标准格式的1分钟K线，可包含多只股票（通过 symbol_column 区分）
+    返回与输入相同列结构的DataFrame（振幅、涨跌幅等无法直接合成的列除外）
+    """
+    if period not in SESSION_PERIODS:
+        raise ValueError(f"不支持的合成周期: {period}，可选 {SESSION_PERIODS}")
+    if df is None or df.empty:
+        return df
+    if period == 1:
+        return df
+
+    sort_columns = [symbol_column, time_column] if symbol_column else [time_column]
+    df = df.sort_values(sort_columns, kind='stable')
+    labels = session_bar_labels(df[time_column], period)
+
+    aggregations = {col: how for col, how in _AGGREGATIONS.items() if col in df.columns}
+    keys = [df[symbol_column], labels.rename(time_column)] if symbol_column else [labels.rename(time_column)]
+    result = df.groupby(keys, sort=False).agg(aggregations).reset_index()
+    return result
+
+
+def resample_minute_frames(frames: Dict[str, pd.DataFrame], periods: Iterable[int],
+                           time_column: str = '时间') -> Dict[int, Dict[str, pd.DataFrame]]:
+    """
+    批量合成多只股票、多个周期的分钟K线
+    所有股票合并为一张表后按周期各做一次分组聚合，而不是逐只股票处理
+    返回 {周期: {股票代码: DataFrame}}
+    """
+    frames = {code: df for code, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return {period: {} for period in periods}
+
+    combined = pd.concat(frames, names=['股票代码', None]).reset_index(level=0)
+    results = {}
+    for period in periods:
+        resampled = resample_minute_bars(combined, period, time_column, symbol_column='股票代码')
+        results[period] = {code: group.drop(columns='股票代码').reset_index(drop=True)
+                           for code, group in resampled.groupby('股票代码', sort=False)}
+    return results
+
+
+def resample_daily_bars(df: pd.DataFrame, time_column: str = '时间', date_column: str = '日期',
+                        complete_only: bool = True) -> pd.DataFrame:
+    """
+    由1分钟K线合成日K线
+    complete_only: 只输出已收盘（最后一根K线为 15:00）的交易日，盘中未完成的当天不输出
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=[date_column] + list(_AGGREGATIONS))
+
+    df = df.sort_values(time_column, kind='stable')
+    dates = df[time_column].dt.normalize().rename(date_column)
+    aggregations = {col: how for col, how in _AGGREGATIONS.items() if col in df.columns}
+    daily = df.groupby(dates, sort=True).agg(aggregations)
+
+    if complete_only:
+        last_times = df[time_column].groupby(dates, sort=True).max()
+        closed = (last_times.dt.hour * 60 + last_times.dt.minute) >= 15 * 60
+        daily = daily[closed.to_numpy()]
+    return daily.reset_index()
+
+
+def infer_volume_units(df: pd.DataFrame) -> np.ndarray:
+    """
+    按 成交额 / (成交量 × 收盘价) 推断每行成交量的单位：1 为股，100 为手
+    没有成交额列或比值不在合理范围内的行为 NaN（例如新浪K线不提供成交额）
+    """
+    units = np.full(len(df), np.nan)
+    if '成交额' not in df.columns or df.empty:
+        return units
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 成交均价与收盘价之比受涨跌停限制，远小于股/手之间100倍的差异
+        per_volume = (df['成交额'] / (df['成交量'] * df['收盘价'])).to_numpy(dtype=np.float64)
+    units[(per_volume > 0.5) & (per_volume < 2)] = 1.0
+    units[(per_volume > 50) & (per_volume < 200)] = 100.0
+    return units
+
+
+def check_daily_consistency(synthesized: pd.DataFrame, source: pd.DataFrame, date_column: str = '日期',
+                            price_tolerance: float = 0.011, volume_tolerance: float = 0.02) -> pd.DataFrame:
+    """
+    比较合成日K线与数据源日K线
+    价格差不超过 price_tolerance 元、成交量相对误差不超过 volume_tolerance 视为一致；
+    成交量比值约为 100 或 0.01 时通常是两个数据源的单位不同（股/手）
+    返回按日期排列的比较结果，'一致' 列为布尔值
+    """
+    merged = synthesized.merge(source, on=date_column, how='inner', suffixes=('_合成', '_数据源'))
+    report = pd.DataFrame({date_column: merged[date_column]})
+
+    consistent = np.ones(len(merged), dtype=bool)
+    for col in ('开盘价', '最高价', '最低价', '收盘价'):
+        diff = (merged[f'{col}_合成'] - merged[f'{col}_数据源']).to_numpy()
+        report[f'{col}差'] = diff
+        consistent &= np.abs(diff) <= price_tolerance
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (merged['成交量_合成'] / merged['成交量_数据源']).to_numpy()
+    report['成交量比'] = ratio
+    consistent &= np.abs(ratio - 1) <= volume_tolerance
+
+    report['一致'] = consistent
+    return report
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+五档盘口解析与历史环形缓冲
+盘口以固定形状的 NumPy 数组 (4, 5) 表示：
+  第0行 买价，第1行 买量，第2行 卖价，第3行 卖量；列为第1~5档
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+DEPTH_LEVELS = 5
+BID_PRICE, BID_VOLUME, ASK_PRICE, ASK_VOLUME = range(4)
+
+# 新浪行情字段中五档盘口的位置：10~19 为买一~买五的(量, 价)，20~29 为卖一~卖五的(量, 价)
+_SINA_BID_VOLUME_INDEX = list(range(10, 20, 2))
+_SINA_BID_PRICE_INDEX = list(range(11, 20, 2))
+_SINA_ASK_VOLUME_INDEX = list(range(20, 30, 2))
+_SINA_ASK_PRICE_INDEX = list(range(21, 30, 2))
+
+
+def parse_sina_depth(stock_data: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    从新浪行情字段列表解析五档盘口
+    out: 可选的 (4, 5) 数组，传入时直接写入以避免分配
+    """
+    if out is None:
+        out = np.empty((4, DEPTH_LEVELS), dtype=np.float64)
+    if len(stock_data) < 30:
+        raise ValueError(f"新浪行情字段数不足，无法解析五档盘口: {len(stock_data)}")
+
+    for row, indexes in ((BID_PRICE, _SINA_BID_PRICE_INDEX), (BID_VOLUME, _SINA_BID_VOLUME_INDEX),
+                         (ASK_PRICE, _SINA_ASK_PRICE_INDEX), (ASK_VOLUME, _SINA_ASK_VOLUME_INDEX)):
+        out[row] = [float(stock_data[i]) if stock_data[i] else 0.0 for i in indexes]
+    return out
+
+
+def depth_spread(depth: np.ndarray) -> np.ndarray:
+    """买一卖一价差，depth 可以是单个 (4, 5) 盘口或 (N, 4, 5) 历史"""
+    return depth[..., ASK_PRICE, 0] - depth[..., BID_PRICE, 0]
+
+
+def depth_imbalance(depth: np.ndarray, levels: int = DEPTH_LEVELS) -> np.ndarray:
+    """
+    前 levels 档的买卖量不平衡度 (买量 - 卖量) / (买量 + 卖量)，取值 [-1, 1]
+    depth 可以是单个 (4, 5) 盘口或 (N, 4, 5) 历史
+    """
+    bid = depth[..., BID_VOLUME, :levels].sum(axis=-1)
+    ask = depth[..., ASK_VOLUME, :levels].sum(axis=-1)
+    total = bid + ask
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, (bid - ask) / total, 0.0)
+
+
+class DepthRingBuffer:
+    """
+    单只股票最近 capacity 个盘口快照的环形缓冲
+    存储在初始化时一次性分配，追加快照不会重新分配内存
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.depths = np.zeros((capacity, 4, DEPTH_LEVELS), dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def next_slot(self) -> np.ndarray:
+        """返回下一个写入位置的 (4, 5) 视图，配合 commit 使用可原地解析"""
+        return self.depths[self._next]
+
+    def commit(self, timestamp: float):
+        """确认 next_slot 已写入，推进写指针"""
+        self.timestamps[self._next] = timestamp
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def append(self, depth: np.ndarray, timestamp: float):
+        """复制一个盘口快照到缓冲中"""
+        self.depths[self._next] = depth
+        self.commit(timestamp)
+
+    def latest(self) -> Optional[np.ndarray]:
+        """最新的盘口快照（视图），缓冲为空时返回 None"""
+        if self._count == 0:
+            return None
+        return self.depths[(self._next - 1) % self.capacity]
+
+    def _order(self) -> np.ndarray:
+        start = (self._next - self._count) % self.capacity
+        return (start + np.arange(self._count)) % self.capacity
+
+    def history(self) -> np.ndarray:
+        """按时间先后排列的盘口历史，形状 (N, 4, 5)（副本）"""
+        return self.depths[self._order()]
+
+    def history_timestamps(self) -> np.ndarray:
+        """与 history() 对应的时间戳"""
+        return self.timestamps[self._order()]
+
+    def spreads(self) -> np.ndarray:
+        """历史各快照的买一卖一价差"""
+        return depth_spread(self.history())
+
+    def imbalances(self, levels: int = DEPTH_LEVELS) -> np.ndarray:
+        """历史各快照的买卖量不平衡度"""
+        return depth_imbalance(self.history(), levels)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按 股票/周期/年月 分区的K线仓库
+目录结构: root_dir/sz000498/daily/2024-01.parquet、root_dir/sz000498/30min/2024-01.parquet ...
+追加数据时只改写新数据所在月份的分区，并按时间列去重，
+重复保存相同的数据不会产生新文件，磁盘占用和写入量只随新增数据增长
+"""
+
+import os
+import threading
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    from .columnar_io import extension_for, find_columnar_file, read_columnar, write_columnar
+except ImportError:
+    from columnar_io import extension_for, find_columnar_file, read_columnar, write_columnar
+
+
+class PartitionedKlineWriter:
+    def __init__(self, root_dir: str, time_column: str = '日期', fmt: str = 'parquet'):
+        """
+        root_dir: 仓库根目录
+        time_column: 用于分区和去重的时间列（日K线为'日期'，分钟K线为'时间'）
+        fmt: 新分区的文件格式 'parquet'、'feather' 或 'npz'，已有分区沿用原格式
+        """
+        self.root_dir = root_dir
+        self.time_column = time_column
+        self.extension = extension_for(fmt)
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, symbol: str, period: str) -> str:
+        return os.path.join(self.root_dir, symbol, period)
+
+    def _load_partition(self, base_path: str) -> Optional[pd.DataFrame]:
+        path = find_columnar_file(base_path)
+        if path is None:
+            return None
+        df = read_columnar(path)
+        df[self.time_column] = pd.to_datetime(df[self.time_column])
+        return df
+
+    def append(self, symbol: str, period: str, df: pd.DataFrame) -> int:
+        """
+        追加一批K线，period 如 'daily'、'30min'
+        时间相同的行以新数据为准（最后一根K线可能是盘中未完成的数据）
+        返回实际改写的分区数
+        """
+        if df is None or df.empty:
+            return 0
+
+        df = df.copy()
+        df[self.time_column] = pd.to_datetime(df[self.time_column])
+        months = df[self.time_column].dt.strftime('%Y-%m')
+        partition_dir = self._partition_dir(symbol, period)
+
+        written = 0
+        with self._lock:
+            for month, new_rows in df.groupby(months, sort=True):
+                base_path = os.path.join(partition_dir, month)
+                existing = self._load_partition(base_path)
+                if existing is not None and not existing.empty:
+                    merged = pd.concat([existing, new_rows], ignore_index=True)
+                    merged = (merged.drop_duplicates(subset=self.time_column, keep='last')
+                                    .sort_values(self.time_column)
+                                    .reset_index(drop=True))
+                    if merged.equals(existing):
+                        # 没有新的K线，也没有被修正的K线，不改写分区
+                        continue
+                else:
+                    merged = new_rows.sort_values(self.time_column).reset_index(drop=True)
+
+                path = find_columnar_file(base_path) or base_path + self.extension
+                write_columnar(merged, path)
+                written += 1
+        return written
+
+    def months(self, symbol: str, period: str) -> List[str]:
+        """返回已有的分区月份（YYYY-MM），按时间排序"""
+        partition_dir = self._partition_dir(symbol, period)
+        if not os.path.isdir(partition_dir):
+            return []
+        names = {os.path.splitext(name)[0] for name in os.listdir(partition_dir)
+                 if not name.endswith('.tmp')}
+        return sorted(names)
+
+    def read(self, symbol: str, period: str, start: Optional[str] = None, end: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        读取 [start, end] 时间范围内的K线，只加载涉及的月份分区
+        start / end: 可被 pd.Timestamp 解析的时间，为 None 时不限制
+        """
+        start_ts = pd.Timestamp(start) if start is not None else None
+        end_ts = pd.Timestamp(end) if end is not None else None
+        if columns is not None and self.time_column not in columns:
+            columns = [self.time_column] + list(columns)
+
+        frames = []
+        for month in self.months(symbol, period):
+            if start_ts is not None and month < start_ts.strftime('%Y-%m'):
+                continue
+            if end_ts is not None and month > end_ts.strftime('%Y-%m'):
+                continue
+            path = find_columnar_file(os.path.join(self._partition_dir(symbol, period), month))
+            if path is not None:
+                frames.append(read_columnar(path, columns=columns))
+
+        if not frames:
+            return None
+        df = pd.concat(frames, ignore_index=True)
+        df[self.time_column] = pd.to_datetime(df[self.time_column])
+        if start_ts is not None:
+            df = df[df[self.time_column] >= start_ts]
+        if end_ts is not None:
+            df = df[df[self.time_column] <= end_ts]
+        return df.reset_index(drop=True)
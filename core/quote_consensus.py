@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多数据源行情共识
+将各数据源的列式财务快照按股票代码和字段对齐，剔除过期的数据源记录和偏离中位数的字段值，
+每个字段取优先级最高的数据源中通过校验的值，并记录该值来自哪个数据源；各数据源互相矛盾时该字段置为 NaN
+"""
+
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 参与共识的字段及允许的偏差：(绝对容差, 相对容差)，偏差不超过两者中较大者即视为一致
+CONSENSUS_FIELDS = {
+    'price': (0.011, 0.002),
+    'pre_close': (0.011, 0.002),
+    'open': (0.011, 0.002),
+    'high': (0.011, 0.002),
+    'low': (0.011, 0.002),
+    'volume': (0.0, 0.02),
+    'amount': (0.0, 0.02),
+    'change': (0.011, 0.0),
+    'change_percent': (0.05, 0.0),
+    'turnover_rate': (0.01, 0.05),
+    'pe': (0.01, 0.05),
+    'pb': (0.01, 0.05),
+    'total_market_cap': (0.0, 0.02),
+    'float_market_cap': (0.0, 0.02),
+}
+
+# 各数据源的值互相矛盾、无法判断时字段来源的标记
+CONFLICT = '冲突'
+
+# 取值可能为0的字段；其余字段为0表示数据源未提供
+ZERO_ALLOWED_FIELDS = ('change', 'change_percent')
+
+
+def build_consensus(frames: Dict[str, pd.DataFrame], priority: List[str], stock_codes: List[str],
+                    max_staleness: float = 60.0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    frames: {数据源名称: 以股票代码为索引的列式快照}，快照含 CONSENSUS_FIELDS 中的列（缺少的列视为未提供），
+            以及 exchange_time（行情时间，Unix秒）或 fetched_at 列
+    priority: 数据源优先级，靠前的数据源在多个值都通过校验时优先采用
+    stock_codes: 结果的股票代码顺序
+    max_staleness: 行情时间落后同一股票最新行情超过该秒数的数据源记录视为过期，不参与共识
+
+    返回 (共识快照, 字段来源)：
+      共识快照含 name、各字段、exchange_time（最新行情时间）、sources（参与共识的数据源数）列；
+      字段来源为同形状的表，值为采用的数据源名称，没有可用值时为空字符串，
+      数据源互相矛盾时为 CONFLICT（对应字段为 NaN）
+    """
+    names = [name for name in priority if name in frames]
+    codes = list(dict.fromkeys(stock_codes))
+    fields = list(CONSENSUS_FIELDS)
+    aligned = [frames[name].reindex(codes) for name in names]
+
+    # values[数据源, 股票, 字段]
+    values = np.stack([
+        np.column_stack([frame[field].to_numpy(dtype=np.float64) if field in frame.columns
+                         else np.full(len(codes), np.nan) for field in fields])
+        for frame in aligned
+    ])
+    zero_missing = np.array([field not in ZERO_ALLOWED_FIELDS for field in fields])
+    values[(values == 0) & zero_missing] = np.nan
+
+    # 按行情时间剔除过期的数据源记录
+    times = np.stack([
+        frame['exchange_time' if 'exchange_time' in frame.columns else 'fetched_at'].to_numpy(dtype=np.float64)
+        for frame in aligned
+    ])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        newest = np.nanmax(times, axis=0)
+        stale = times < newest - max_staleness
+        values[stale] = np.nan
+        median = np.nanmedian(values, axis=0)
+
+    # 与中位数的偏差在容差内的值视为一致
+    abs_tol = np.array([CONSENSUS_FIELDS[field][0] for field in fields])
+    rel_tol = np.array([CONSENSUS_FIELDS[field][1] for field in fields])
+    allowed = np.maximum(abs_tol, rel_tol * np.abs(median))
+    valid = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        accepted = np.abs(values - median) <= allowed
+
+    # 取优先级最高的一致值；没有一致的值（两个数据源互相矛盾）时无法判断哪个正确，
+    # 该字段为 NaN，来源标记为 CONFLICT，而不是按优先级选择
+    has_accepted = accepted.any(axis=0)
+    conflict = valid.any(axis=0) & ~has_accepted
+    chosen = np.argmax(accepted, axis=0)
+
+    merged = np.take_along_axis(values, chosen[np.newaxis], axis=0)[0]
+    merged[~has_accepted] = np.nan
+    provenance = np.array(names, dtype=object)[chosen]
+    provenance[~has_accepted] = ''
+    provenance[conflict] = CONFLICT
+
+    rejected = int((valid & ~accepted & has_accepted).sum())
+    if rejected:
+        print(f"⚠️ 共识快照剔除了 {rejected} 个偏离其他数据源的字段值")
+    if conflict.any():
+        print(f"⚠️ 共识快照有 {int(conflict.sum())} 个字段各数据源互相矛盾，已置为 NaN")
+
+    index = pd.Index(codes, name='code')
+    result = pd.DataFrame(merged, index=index, columns=fields)
+    name_column: Optional[pd.Series] = None
+    for frame in aligned:
+        if 'name' in frame.columns:
+            name_column = frame['name'] if name_column is None else name_column.combine_first(frame['name'])
+    result.insert(0, 'name', name_column if name_column is not None else '')
+    result['exchange_time'] = newest
+    result['sources'] = (valid.any(axis=2)).sum(axis=0)
+
+    return result, pd.DataFrame(provenance, index=index, columns=fields)
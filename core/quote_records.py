@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的行情记录
+Quote / FinancialQuote 只保存原始数值，格式化（亿、%等）仅在 to_dict / to_unified_dict 显示时进行；
+exchange_time 为数据源报告的行情时间（Unix秒），fetched_at 为本地获取时间；
+QuoteSnapshot 以列数组（NumPy）保存一批行情，适合大批量股票的轮询
+"""
+
+import datetime
+import functools
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .trading_session import CHINA_TZ
+except ImportError:
+    from trading_session import CHINA_TZ
+
+
+@dataclass
+class Quote:
+    """单只股票的实时行情"""
+    __slots__ = ('code', 'name', 'price', 'pre_close', 'open', 'high', 'low', 'volume', 'amount',
+                 'bid1', 'bid1_volume', 'ask1', 'ask1_volume', 'update_time', 'exchange_time', 'fetched_at')
+
+    code: str
+    name: str
+    price: float
+    pre_close: float
+    open: float
+    high: float
+    low: float
+    volume: int
+    amount: float
+    bid1: float
+    bid1_volume: int
+    ask1: float
+    ask1_volume: int
+    update_time: str
+    exchange_time: float
+    fetched_at: float
+
+    @property
+    def change(self) -> float:
+        return self.price - self.pre_close
+
+    @property
+    def change_percent(self) -> float:
+        return (self.change / self.pre_close * 100) if self.pre_close != 0 else 0
+
+    def to_dict(self) -> Dict:
+        """转换为 get_sina_realtime_data 原有的中文键字典"""
+        return {
+            '股票代码': self.code,
+            '股票名称': self.name,
+            '当前价格': self.price,
+            '涨跌额': self.change,
+            '涨跌幅': self.change_percent,
+            '今日开盘': self.open,
+            '昨日收盘': self.pre_close,
+            '今日最高': self.high,
+            '今日最低': self.low,
+            '成交量': self.volume,
+            '成交额': self.amount,
+            '买一价': self.bid1,
+            '买一量': self.bid1_volume,
+            '卖一价': self.ask1,
+            '卖一量': self.ask1_volume,
+            '更新时间': self.update_time,
+            '行情时间': _format_exchange_time(self.exchange_time),
+            '数据时间戳': datetime.datetime.fromtimestamp(self.fetched_at).isoformat()
+        }
+
+
+# 新浪财经字段[30]+[31]、腾讯财经字段[30]的行情时间格式（北京时间）
+SINA_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+TENCENT_TIME_FORMAT = '%Y%m%d%H%M%S'
+
+
+@functools.lru_cache(maxsize=4096)
+def exchange_timestamp(text: str, fmt: str) -> float:
+    """
+    将数据源返回的交易所时间字符串（北京时间）转换为 Unix 秒，无法解析时返回 NaN
+    同一批行情的时间字符串大多相同，结果按字符串缓存
+    """
+    try:
+        return datetime.datetime.strptime(text, fmt).replace(tzinfo=CHINA_TZ).timestamp()
+    except (ValueError, TypeError):
+        return math.nan
+
+
+def _format_exchange_time(value: Optional[float]) -> str:
+    if value is None or math.isnan(value) or value <= 0:
+        return ''
+    return datetime.datetime.fromtimestamp(value, CHINA_TZ).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _format_percent(value: Optional[float], show_zero: bool = False) -> str:
+    if value is None or math.isnan(value) or (value == 0 and not show_zero):
+        return '-'
+    return f"{value:.2f}%"
+
+
+def _format_yi(value: Optional[float]) -> str:
+    """以元为单位的金额格式化为亿元"""
+    if value is None or math.isnan(value) or value <= 0:
+        return "0"
+    return f"{value / 100000000:.2f}亿"
+
+
+def _format_market_cap(value: Optional[float]) -> str:
+    """以元为单位的市值，1亿以上显示为亿元，1万以上显示为万元"""
+    if value is None or math.isnan(value):
+        return "0"
+    if value >= 100000000:
+        return f"{value / 100000000:.2f}亿"
+    if value >= 10000:
+        return f"{value / 10000:.2f}万"
+    return f"{value:,.0f}"
+
+
+@dataclass
+class FinancialQuote:
+    """
+    单只股票的财务快照
+    金额字段单位统一为元，换手率/涨跌幅为百分数数值；数据源未提供的字段为 None
+    """
+    __slots__ = ('code', 'name', 'source', 'price', 'pre_close', 'open', 'high', 'low', 'volume', 'amount',
+                 'change', 'change_percent', 'turnover_rate', 'pe', 'pb', 'total_market_cap',
+                 'float_market_cap', 'exchange_time', 'fetched_at')
+
+    code: str
+    name: str
+    source: str
+    price: float
+    pre_close: float
+    open: float
+    high: float
+    low: float
+    volume: float
+    amount: float
+    change: float
+    change_percent: float
+    turnover_rate: Optional[float]
+    pe: Optional[float]
+    pb: Optional[float]
+    total_market_cap: Optional[float]
+    float_market_cap: Optional[float]
+    exchange_time: Optional[float]
+    fetched_at: float
+
+    def _price_dict(self) -> Dict:
+        return {
+            '股票代码': self.code,
+            '股票名称': self.name,
+            '当前价格': self.price,
+            '昨收价': self.pre_close,
+            '开盘价': self.open,
+            '最高价': self.high,
+            '最低价': self.low,
+            '成交量': self.volume,
+            '成交额': self.amount,
+        }
+
+    def _finish_dict(self, data: Dict, change_percent: str) -> Dict:
+        data.update({
+            '涨跌额': self.change,
+            '涨跌幅': change_percent,
+            '数据来源': self.source,
+            '行情时间': _format_exchange_time(self.exchange_time),
+            '数据时间戳': datetime.datetime.fromtimestamp(self.fetched_at).isoformat()
+        })
+        return data
+
+    def to_dict(self) -> Dict:
+        """
+        转换为 get_*_financial_data_fixed 原有的中文键字典，各数据源保持原有的显示格式：
+        东方财富市盈率为两位小数字符串（保留负值），市值不足1亿时以万显示；
+        新浪财经涨跌幅、换手率为0时仍显示数值
+        """
+        data = self._price_dict()
+        if self.source == '腾讯财经':
+            # 腾讯财经原有字典的成交量单位为手
+            data['成交量'] = int(round(self.volume / 100))
+        if self.source == '东方财富':
+            pe = "N/A" if not self.pe or math.isnan(self.pe) else f"{self.pe:.2f}"
+            format_cap = _format_market_cap
+        else:
+            pe = self.pe if self.pe is not None and self.pe > 0 else "N/A"
+            format_cap = _format_yi
+
+        if self.turnover_rate is not None:
+            data['换手率'] = f"{self.turnover_rate:.2f}%" if self.source == '新浪财经' \
+                else _format_percent(self.turnover_rate)
+        if self.pe is not None:
+            data['市盈率(动态)'] = pe
+        if self.pb is not None:
+            data['市净率'] = self.pb
+        if self.total_market_cap is not None:
+            data['总市值'] = format_cap(self.total_market_cap)
+        if self.float_market_cap is not None:
+            data['流通市值'] = format_cap(self.float_market_cap)
+
+        change_percent = f"{self.change_percent:.2f}%" if self.source == '新浪财经' \
+            else _format_percent(self.change_percent)
+        return self._finish_dict(data, change_percent)
+
+    def to_unified_dict(self) -> Dict:
+        """
+        转换为各数据源格式统一的中文键字典，便于跨数据源比较：
+        市盈率为数值（不为正时为 N/A），市值以亿显示，涨跌幅/换手率为0时显示 '-'
+        """
+        data = self._price_dict()
+        if self.turnover_rate is not None:
+            data['换手率'] = _format_percent(self.turnover_rate)
+        if self.pe is not None:
+            data['市盈率(动态)'] = self.pe if self.pe > 0 else "N/A"
+        if self.pb is not None:
+            data['市净率'] = self.pb
+        if self.total_market_cap is not None:
+            data['总市值'] = _format_yi(self.total_market_cap)
+        if self.float_market_cap is not None:
+            data['流通市值'] = _format_yi(self.float_market_cap)
+        return self._finish_dict(data, _format_percent(self.change_percent))
+
+
+def financial_quotes_to_frame(quotes: Iterable[FinancialQuote]) -> pd.DataFrame:
+    """
+    将一批 FinancialQuote 按列转换为以股票代码为索引的DataFrame（原始数值）
+    未提供的字段（None）转换为 NaN
+    """
+    quotes = list(quotes)
+    data = {}
+    for field in FinancialQuote.__slots__:
+        if field == 'code':
+            continue
+        values = [getattr(q, field) for q in quotes]
+        if field in ('name', 'source'):
+            data[field] = values
+        else:
+            data[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return pd.DataFrame(data, index=pd.Index([q.code for q in quotes], name='code'))
+
+
+def financial_quotes_from_columns(codes: List[str], source: str, columns: Dict[str, np.ndarray],
+                                  exchange_times: List[Optional[float]],
+                                  fetched_at: float) -> Dict[str, FinancialQuote]:
+    """
+    由按列解析的结果（RecordParser.parse_many）批量构造 FinancialQuote，返回 {股票代码: FinancialQuote}
+    各列按位置传给构造函数，不生成逐条字典；columns 中没有的字段为 None
+    """
+    count = len(codes)
+    args = []
+    for field in FinancialQuote.__slots__:
+        if field == 'code':
+            args.append(codes)
+        elif field == 'source':
+            args.append([source] * count)
+        elif field == 'exchange_time':
+            args.append(exchange_times)
+        elif field == 'fetched_at':
+            args.append([fetched_at] * count)
+        elif field in columns:
+            args.append(columns[field].tolist())
+        else:
+            args.append([None] * count)
+    return dict(zip(codes, map(FinancialQuote, *args)))
+
+
+def format_exchange_times(timestamps: np.ndarray) -> np.ndarray:
+    """Unix秒数组格式化为 'YYYY-MM-DD HH:MM:SS'（北京时间），缺失为空字符串"""
+    return np.array([_format_exchange_time(ts) for ts in timestamps.tolist()], dtype=str)
+
+
+def parse_exchange_times(values: Iterable[str], fmt: str) -> np.ndarray:
+    """
+    批量将数据源返回的交易所时间字符串（北京时间）转换为 Unix 秒（float64）
+    无法解析的值为 NaN
+    """
+    times = pd.to_datetime(pd.Series(list(values), dtype=object), format=fmt, errors='coerce')
+    times = times.dt.tz_localize('Asia/Shanghai')
+    seconds = (times - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)
+    return seconds.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class QuoteSnapshot:
+    """
+    一批实时行情的列式存储
+    每个数值字段为一个 NumPy 数组，按 codes 的顺序排列
+    """
+    FLOAT_FIELDS = ('price', 'pre_close', 'open', 'high', 'low', 'amount', 'bid1', 'ask1',
+                    'exchange_time', 'fetched_at')
+    INT_FIELDS = ('volume', 'bid1_volume', 'ask1_volume')
+
+    def __init__(self, codes: np.ndarray, names: np.ndarray, update_times: np.ndarray,
+                 arrays: Dict[str, np.ndarray]):
+        self.codes = codes
+        self.names = names
+        self.update_times = update_times
+        self.arrays = arrays
+        self._index = {code: i for i, code in enumerate(codes.tolist())}
+
+    @classmethod
+    def from_quotes(cls, quotes: Iterable[Quote]) -> 'QuoteSnapshot':
+        quotes = list(quotes)
+        arrays = {}
+        for field in cls.FLOAT_FIELDS:
+            arrays[field] = np.fromiter((getattr(q, field) for q in quotes), dtype=np.float64, count=len(quotes))
+        for field in cls.INT_FIELDS:
+            arrays[field] = np.fromiter((getattr(q, field) for q in quotes), dtype=np.int64, count=len(quotes))
+        return cls(
+            codes=np.array([q.code for q in quotes], dtype=str),
+            names=np.array([q.name for q in quotes], dtype=str),
+            update_times=np.array([q.update_time for q in quotes], dtype=str),
+            arrays=arrays,
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._index
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.arrays[field]
+
+    @property
+    def change(self) -> np.ndarray:
+        return self.arrays['price'] - self.arrays['pre_close']
+
+    @property
+    def change_percent(self) -> np.ndarray:
+        pre_close = self.arrays['pre_close']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(pre_close != 0, self.change / pre_close * 100, 0.0)
+        return pct
+
+    def get(self, code: str) -> Optional[Quote]:
+        """取出单只股票的 Quote，不存在时返回 None"""
+        i = self._index.get(code)
+        if i is None:
+            return None
+        values = {field: self.arrays[field][i].item() for field in self.FLOAT_FIELDS + self.INT_FIELDS}
+        return Quote(code=code, name=str(self.names[i]), update_time=str(self.update_times[i]), **values)
+
+    def to_dicts(self) -> Dict[str, Dict]:
+        """转换为以股票代码为键的原有中文键字典"""
+        return {code: self.get(code).to_dict() for code in self._index}
+
+    def to_frame(self) -> pd.DataFrame:
+        """转换为以股票代码为索引的DataFrame（原始数值）"""
+        data = {'name': self.names, 'update_time': self.update_times}
+        data.update(self.arrays)
+        return pd.DataFrame(data, index=pd.Index(self.codes, name='code'))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按主机的自适应限速与熔断
+每个数据源主机一个令牌桶：请求正常时缓慢提高速率，遇到 429、空响应或超时时速率减半（AIMD）；
+连续失败达到阈值时熔断该主机，熔断期间的请求立即失败，使 auto 模式直接切换到下一个数据源，
+冷却结束后放行一个试探请求，成功则恢复
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """主机处于熔断状态，请求未发出"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float = 10.0, capacity: float = 10.0,
+                 min_rate: float = 0.5, max_rate: float = 50.0, increase_step: float = 0.5):
+        """
+        rate: 初始速率（请求/秒）
+        capacity: 桶容量，允许的突发请求数
+        min_rate / max_rate: 自适应调整的速率范围
+        increase_step: 每次成功请求提高的速率
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """取得一个令牌，令牌不足时等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        """请求成功，线性提高速率"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self):
+        """被限流或超时，速率减半并清空已积累的令牌"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        failure_threshold: 连续失败多少次后熔断
+        reset_timeout: 熔断持续时间（秒），之后放行一个试探请求
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """当前是否允许发出请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # 冷却结束，只放行一个试探请求
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class HostRateLimiter:
+    """为每个主机维护一个令牌桶和一个熔断器"""
+
+    def __init__(self, rate: float = 10.0, capacity: float = 10.0, min_rate: float = 0.5,
+                 max_rate: float = 50.0, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 host_rates: Optional[Dict[str, float]] = None):
+        """
+        rate 等参数为各主机的默认配置，host_rates 按主机覆盖初始速率
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.host_rates = dict(host_rates or {})
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host: str):
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.host_rates.get(host, self.rate), self.capacity,
+                                     self.min_rate, self.max_rate)
+                self.buckets[host] = bucket
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return bucket, self.breakers[host]
+
+    def before_request(self, host: str):
+        """请求前调用：熔断中抛出 CircuitOpenError，否则等待令牌"""
+        bucket, breaker = self._get(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host} 连续失败已熔断，{breaker.reset_timeout:.0f}秒内跳过该数据源")
+        bucket.acquire()
+
+    def after_response(self, host: str, response: requests.Response):
+        """根据响应调整速率：429、5xx 或空响应体视为被限流"""
+        bucket, breaker = self._get(host)
+        if response.status_code == 429 or response.status_code >= 500 or not response.content:
+            bucket.on_throttle()
+            breaker.record_failure()
+        else:
+            bucket.on_success()
+            breaker.record_success()
+
+    def after_error(self, host: str, error: Exception):
+        """请求异常（超时、连接失败及其他任何异常）时调用"""
+        bucket, breaker = self._get(host)
+        bucket.on_throttle()
+        breaker.record_failure()
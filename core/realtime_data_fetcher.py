@@ -5,16 +5,70 @@
 支持实时分时数据、历史分时数据获取
 """
 
-import requests
 import pandas as pd
 import time
 import datetime
 import json
+import math
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, NamedTuple, Optional
 
-class RealtimeDataFetcher:
-    def __init__(self):
+import numpy as np
+
+try:
+    from .http_transport import HttpTransport
+    from .source_race import MultiSourceFetcher, SourceRacer
+    from .source_health import SourceHealthTracker
+    from .kline_parsers import (parse_eastmoney_klines, parse_sina_klines,
+                                EASTMONEY_MINUTE_FORMAT, SINA_MINUTE_FORMAT)
+    from .snapshot_cache import SnapshotCache
+    from .quote_records import (Quote, QuoteSnapshot, SINA_TIME_FORMAT, exchange_timestamp,
+                                format_exchange_times)
+    from .order_book import DepthRingBuffer, parse_sina_depth
+    from .kline_store import KlineStore
+    from .columnar_io import extension_for, write_columnar
+    from .partitioned_store import PartitionedKlineWriter
+    from .eastmoney_quotes import ULIST_BATCH_SIZE, ULIST_FIELDS, fetch_ulist
+    from .sina_quotes import SINA_BATCH_SIZE, fetch_sina_texts, iter_sina_records
+    from .trading_session import is_trading_time, seconds_until_next_session
+except ImportError:
+    from http_transport import HttpTransport
+    from source_race import MultiSourceFetcher, SourceRacer
+    from source_health import SourceHealthTracker
+    from kline_parsers import (parse_eastmoney_klines, parse_sina_klines,
+                               EASTMONEY_MINUTE_FORMAT, SINA_MINUTE_FORMAT)
+    from snapshot_cache import SnapshotCache
+    from quote_records import (Quote, QuoteSnapshot, SINA_TIME_FORMAT, exchange_timestamp,
+                               format_exchange_times)
+    from order_book import DepthRingBuffer, parse_sina_depth
+    from kline_store import KlineStore
+    from columnar_io import extension_for, write_columnar
+    from partitioned_store import PartitionedKlineWriter
+    from eastmoney_quotes import ULIST_BATCH_SIZE, ULIST_FIELDS, fetch_ulist
+    from sina_quotes import SINA_BATCH_SIZE, fetch_sina_texts, iter_sina_records
+    from trading_session import is_trading_time, seconds_until_next_session
+
+class QuoteTick(NamedTuple):
+    """行情变化记录，由 RealtimeDataFetcher.stream 产生"""
+    code: str
+    price: float
+    volume: int
+    amount: float
+    bid1: float
+    bid1_volume: int
+    ask1: float
+    ask1_volume: int
+    update_time: str
+
+
+class RealtimeDataFetcher(MultiSourceFetcher):
+    # 新浪 list 接口单次请求的最大代码数（受URL长度限制）
+    SINA_BATCH_SIZE = SINA_BATCH_SIZE
+
+    def __init__(self, transport: Optional[HttpTransport] = None, racer: Optional[SourceRacer] = None,
+                 cache: Optional[SnapshotCache] = None, depth_history_size: int = 100,
+                 minute_store: Optional[KlineStore] = None,
+                 health: Optional[SourceHealthTracker] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -22,6 +76,20 @@ class RealtimeDataFetcher:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive'
         }
+        self._init_sources(transport, racer, health)
+        # 快照缓存，多个调用方可共享同一实例以合并短时间内的重复请求
+        self.cache = cache
+        # 新浪行情接口需要带Referer
+        self.sina_headers = self.headers.copy()
+        self.sina_headers['Referer'] = 'http://finance.sina.com.cn'
+        # 每只股票保留的五档盘口快照数量及其环形缓冲
+        self.depth_history_size = depth_history_size
+        self.depth_history: Dict[str, DepthRingBuffer] = {}
+        # 本地1分钟K线仓库（dataset='1min'，时间列为'时间'），设置后获取的分钟数据会合并保存，
+        # 可供 KlineDataFetcher 由其合成日K线
+        self.minute_store = minute_store
+        # 条件刷新记录的每只股票最近一次行情时间（新浪 'YYYY-MM-DD HH:MM:SS'）
+        self._last_exchange_times: Dict[str, str] = {}
     
     def get_sina_realtime_data(self, stock_code: str) -> Optional[Dict]:
         """
@@ -31,55 +99,250 @@ class RealtimeDataFetcher:
             # 新浪财经实时数据API
             url = f"http://hq.sinajs.cn/list={stock_code}"
             
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.transport.get(url, headers=self.headers)
             
             if response.status_code == 200 and response.text.strip():
                 # 解析新浪财经实时数据
-                if f'var hq_str_{stock_code}=' in response.text:
-                    data_part = response.text.split('="')[1].split('";')[0]
-                    stock_data = data_part.split(',')
-                    
-                    # 新浪财经实时数据格式解析
-                    # 0:股票名称, 1:今日开盘价, 2:昨日收盘价, 3:当前价格, 4:今日最高价, 5:今日最低价
-                    # 6:竞买价, 7:竞卖价, 8:成交股数, 9:成交金额
-                    # 10:买一量, 11:买一价, 12:买二量, 13:买二价, 14:买三量, 15:买三价, 16:买四量, 17:买四价, 18:买五量, 19:买五价
-                    # 20:卖一量, 21:卖一价, 22:卖二量, 23:卖二价, 24:卖三量, 25:卖三价, 26:卖四量, 27:卖四价, 28:卖五量, 29:卖五价
-                    # 30:日期, 31:时间
-                    
-                    current_price = float(stock_data[3]) if stock_data[3] != '' else 0
-                    yesterday_close = float(stock_data[2]) if stock_data[2] != '' else 0
-                    
-                    # 计算涨跌额和涨跌幅
-                    change_amount = current_price - yesterday_close
-                    change_percent = (change_amount / yesterday_close * 100) if yesterday_close != 0 else 0
-                    
-                    realtime_data = {
-                        '股票代码': stock_code,
-                        '股票名称': stock_data[0] if len(stock_data) > 0 else '',
-                        '当前价格': current_price,
-                        '涨跌额': change_amount,
-                        '涨跌幅': change_percent,
-                        '今日开盘': float(stock_data[1]) if len(stock_data) > 1 and stock_data[1] != '' else 0,
-                        '昨日收盘': yesterday_close,
-                        '今日最高': float(stock_data[4]) if len(stock_data) > 4 and stock_data[4] != '' else 0,
-                        '今日最低': float(stock_data[5]) if len(stock_data) > 5 and stock_data[5] != '' else 0,
-                        '成交量': int(stock_data[8]) if len(stock_data) > 8 and stock_data[8] != '' else 0,
-                        '成交额': float(stock_data[9]) if len(stock_data) > 9 and stock_data[9] != '' else 0,
-                        '买一价': float(stock_data[11]) if len(stock_data) > 11 and stock_data[11] != '' else 0,
-                        '买一量': int(stock_data[10]) if len(stock_data) > 10 and stock_data[10] != '' else 0,
-                        '卖一价': float(stock_data[21]) if len(stock_data) > 21 and stock_data[21] != '' else 0,
-                        '卖一量': int(stock_data[20]) if len(stock_data) > 20 and stock_data[20] != '' else 0,
-                        '更新时间': f"{stock_data[30]} {stock_data[31]}" if len(stock_data) > 31 else '',
-                        '数据时间戳': datetime.datetime.now().isoformat()
-                    }
-                    
-                    return realtime_data
+                return self.parse_sina_realtime_text(response.text).get(stock_code)
             return None
             
         except Exception as e:
             print(f"获取新浪实时数据失败: {e}")
             return None
-    
+
+    def get_sina_realtime_batch(self, stock_codes: List[str], batch_size: int = None) -> Dict[str, Dict]:
+        """
+        从新浪财经批量获取实时数据
+        hq.sinajs.cn/list= 支持逗号分隔的多个代码，按 batch_size 分组请求
+        返回以股票代码为键的字典，获取失败的代码不会出现在结果中
+        """
+        quotes = self.get_sina_quotes_batch(stock_codes, batch_size)
+        return {code: quote.to_dict() for code, quote in quotes.items()}
+
+    def get_sina_quotes_batch(self, stock_codes: List[str], batch_size: int = None) -> Dict[str, Quote]:
+        """批量获取实时行情，返回以股票代码为键的紧凑 Quote 记录"""
+        results = {}
+        for text in self._fetch_sina_texts(stock_codes, batch_size):
+            results.update(self.parse_sina_quotes(text))
+        return results
+
+    def _fetch_sina_texts(self, stock_codes: List[str], batch_size: int = None) -> Iterator[str]:
+        """按 batch_size 分组请求新浪 list 接口，逐个产出响应文本"""
+        return fetch_sina_texts(self.transport, stock_codes, self.sina_headers, batch_size or self.SINA_BATCH_SIZE)
+
+    def get_sina_realtime_quote(self, stock_code: str) -> Optional[Quote]:
+        """获取单只股票的紧凑 Quote 记录"""
+        return self.get_sina_quotes_batch([stock_code]).get(stock_code)
+
+    def get_sina_realtime_snapshot(self, stock_codes: List[str], batch_size: int = None) -> QuoteSnapshot:
+        """批量获取实时行情，返回列式存储的 QuoteSnapshot"""
+        return QuoteSnapshot.from_quotes(self.get_sina_quotes_batch(stock_codes, batch_size).values())
+
+    def get_eastmoney_realtime_snapshot(self, stock_codes: List[str],
+                                        batch_size: int = ULIST_BATCH_SIZE) -> QuoteSnapshot:
+        """
+        通过东方财富 ulist 接口批量获取实时行情，返回列式存储的 QuoteSnapshot
+        ulist 不提供买一/卖一，对应价格为 NaN、挂单量为0；成交量已换算为股
+        """
+        codes, records = fetch_ulist(self.transport, stock_codes, self.headers, batch_size)
+        fetched_at = time.time()
+        columns = ULIST_FIELDS.parse_many(records)
+        n = len(records)
+
+        arrays = {field: columns[field].astype(np.float64)
+                  for field in QuoteSnapshot.FLOAT_FIELDS if field in columns}
+        arrays['bid1'] = np.full(n, np.nan)
+        arrays['ask1'] = np.full(n, np.nan)
+        arrays['fetched_at'] = np.full(n, fetched_at)
+        arrays['volume'] = columns['volume'].astype(np.int64)
+        arrays['bid1_volume'] = np.zeros(n, dtype=np.int64)
+        arrays['ask1_volume'] = np.zeros(n, dtype=np.int64)
+
+        return QuoteSnapshot(
+            codes=np.array(codes, dtype=str),
+            names=columns['name'].astype(str),
+            update_times=format_exchange_times(columns['exchange_time']),
+            arrays=arrays,
+        )
+
+    def parse_sina_realtime_text(self, text: str) -> Dict[str, Dict]:
+        """
+        一次性解析新浪财经返回文本中的所有 var hq_str_xxx="..."; 行
+        返回以股票代码为键的实时数据字典
+        """
+        return {code: quote.to_dict() for code, quote in self.parse_sina_quotes(text).items()}
+
+    def parse_sina_quotes(self, text: str) -> Dict[str, Quote]:
+        """解析新浪财经返回文本，返回以股票代码为键的 Quote 记录"""
+        results = {}
+        fetched_at = time.time()
+        for stock_code, stock_data in iter_sina_records(text):
+            try:
+                results[stock_code] = self._parse_sina_quote(stock_code, stock_data, fetched_at)
+            except (ValueError, IndexError) as e:
+                print(f"解析新浪实时数据失败 ({stock_code}): {e}")
+        return results
+
+    def get_sina_depth_batch(self, stock_codes: List[str], batch_size: int = None) -> Dict[str, np.ndarray]:
+        """
+        批量获取五档盘口
+        返回以股票代码为键的 (4, 5) 数组（行依次为买价、买量、卖价、卖量），
+        同时写入每只股票的盘口历史环形缓冲 self.depth_history；
+        返回的数组为副本，不会被之后写入环形缓冲的盘口覆盖
+        """
+        results = {}
+        for text in self._fetch_sina_texts(stock_codes, batch_size):
+            fetched_at = time.time()
+            for stock_code, stock_data in iter_sina_records(text):
+                history = self.depth_history.get(stock_code)
+                if history is None:
+                    history = DepthRingBuffer(self.depth_history_size)
+                    self.depth_history[stock_code] = history
+                try:
+                    # 直接解析到环形缓冲的下一个位置，不额外分配数组
+                    depth = parse_sina_depth(stock_data, out=history.next_slot())
+                except (ValueError, IndexError) as e:
+                    print(f"解析新浪五档盘口失败 ({stock_code}): {e}")
+                    continue
+                history.commit(fetched_at)
+                results[stock_code] = depth.copy()
+        return results
+
+    @staticmethod
+    def _sina_field(stock_data: List[str], index: int, cast=float):
+        """取新浪字段并转换类型，缺失或为空时返回0"""
+        return cast(stock_data[index]) if len(stock_data) > index and stock_data[index] != '' else 0
+
+    def _parse_sina_quote(self, stock_code: str, stock_data: List[str], fetched_at: float) -> Quote:
+        """将新浪财经单只股票的字段列表转换为 Quote"""
+        # 新浪财经实时数据格式解析
+        # 0:股票名称, 1:今日开盘价, 2:昨日收盘价, 3:当前价格, 4:今日最高价, 5:今日最低价
+        # 6:竞买价, 7:竞卖价, 8:成交股数, 9:成交金额
+        # 10:买一量, 11:买一价, 12:买二量, 13:买二价, 14:买三量, 15:买三价, 16:买四量, 17:买四价, 18:买五量, 19:买五价
+        # 20:卖一量, 21:卖一价, 22:卖二量, 23:卖二价, 24:卖三量, 25:卖三价, 26:卖四量, 27:卖四价, 28:卖五量, 29:卖五价
+        # 30:日期, 31:时间
+        n = len(stock_data)
+        num = self._sina_field
+
+        return Quote(
+            code=stock_code,
+            name=stock_data[0] if n > 0 else '',
+            price=num(stock_data, 3),
+            pre_close=num(stock_data, 2),
+            open=num(stock_data, 1),
+            high=num(stock_data, 4),
+            low=num(stock_data, 5),
+            volume=num(stock_data, 8, int),
+            amount=num(stock_data, 9),
+            bid1=num(stock_data, 11),
+            bid1_volume=num(stock_data, 10, int),
+            ask1=num(stock_data, 21),
+            ask1_volume=num(stock_data, 20, int),
+            update_time=f"{stock_data[30]} {stock_data[31]}" if n > 31 else '',
+            exchange_time=exchange_timestamp(f"{stock_data[30]} {stock_data[31]}", SINA_TIME_FORMAT)
+            if n > 31 else math.nan,
+            fetched_at=fetched_at,
+        )
+
+    def refresh_quotes(self, stock_codes: List[str], batch_size: int = None,
+                       force: bool = False) -> Dict[str, Quote]:
+        """
+        条件刷新：只返回行情时间（新浪字段30/31）比上次刷新更新的股票
+        行情时间未前进的记录不解析、不返回；非交易时段不发出请求，直接返回空字典
+        force: 为 True 时忽略交易时段判断（如收盘后取一次最终行情）
+        """
+        if not force and not is_trading_time():
+            return {}
+        return self._fetch_advanced_quotes(stock_codes, batch_size, self._last_exchange_times)
+
+    def reset_refresh_state(self):
+        """清除条件刷新记录的行情时间，下一次 refresh_quotes 返回全部股票"""
+        self._last_exchange_times.clear()
+
+    def _fetch_advanced_quotes(self, stock_codes: List[str], batch_size: Optional[int],
+                               last_times: Dict[str, str]) -> Dict[str, Quote]:
+        """批量请求行情，只解析行情时间晚于 last_times 中记录的股票，并更新 last_times"""
+        results = {}
+        for text in self._fetch_sina_texts(stock_codes, batch_size):
+            fetched_at = time.time()
+            for stock_code, stock_data in iter_sina_records(text):
+                if len(stock_data) <= 31:
+                    continue
+                # 新浪的行情时间为定长字符串，可直接按字符串比较先后，无需解析
+                stamp = f"{stock_data[30]} {stock_data[31]}"
+                if stamp <= last_times.get(stock_code, ''):
+                    continue
+                try:
+                    quote = self._parse_sina_quote(stock_code, stock_data, fetched_at)
+                except (ValueError, IndexError) as e:
+                    print(f"解析新浪实时数据失败 ({stock_code}): {e}")
+                    continue
+                last_times[stock_code] = stamp
+                results[stock_code] = quote
+        return results
+
+    def stream(self, stock_codes: List[str], interval: float = 3.0,
+               max_cycles: Optional[int] = None, session_aware: bool = False) -> Iterator[QuoteTick]:
+        """
+        持续轮询行情，只产出发生变化的记录
+        每个周期批量请求全部代码，行情时间未前进的股票直接跳过；
+        其余股票与上一次的价格、成交量、买一/卖一比较，有变化才产出 QuoteTick；首个周期产出所有获取到的股票
+        interval: 轮询间隔（秒），从每个周期开始时计算
+        max_cycles: 最多轮询的周期数，None 表示一直轮询
+        session_aware: 为 True 时非交易时段不发出请求；跳过的周期同样计入 max_cycles，
+                       每次最多休眠 interval 秒，调用方不会被长时间阻塞
+        """
+        last_ticks: Dict[str, tuple] = {}
+        last_times: Dict[str, str] = {}
+        cycle = 0
+        paused = False
+
+        while max_cycles is None or cycle < max_cycles:
+            started = time.time()
+            wait = seconds_until_next_session() if session_aware else 0.0
+            if wait > 0:
+                if not paused:
+                    print(f"⏸️ 非交易时段，约 {wait / 60:.0f} 分钟后恢复轮询")
+                    paused = True
+                cycle += 1
+                if max_cycles is not None and cycle >= max_cycles:
+                    break
+                time.sleep(min(wait, interval))
+                continue
+            paused = False
+
+            quotes = self._fetch_advanced_quotes(stock_codes, None, last_times)
+
+            for stock_code, quote in quotes.items():
+                tick = QuoteTick(
+                    code=stock_code,
+                    price=quote.price,
+                    volume=quote.volume,
+                    amount=quote.amount,
+                    bid1=quote.bid1,
+                    bid1_volume=quote.bid1_volume,
+                    ask1=quote.ask1,
+                    ask1_volume=quote.ask1_volume,
+                    update_time=quote.update_time,
+                )
+                # 比较除代码和时间外的行情字段
+                state = tick[1:8]
+                if last_ticks.get(stock_code) != state:
+                    last_ticks[stock_code] = state
+                    yield tick
+
+            cycle += 1
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+            time.sleep(max(0.0, interval - (time.time() - started)))
+
+    def get_realtime_batch_frame(self, stock_codes: List[str]) -> Optional[pd.DataFrame]:
+        """批量获取实时数据并转换为以股票代码为索引的DataFrame"""
+        results = self.get_sina_realtime_batch(stock_codes)
+        if not results:
+            return None
+        return pd.DataFrame.from_dict(results, orient='index')
+
     def get_sina_minute_data(self, stock_code: str, days: int = 1) -> Optional[pd.DataFrame]:
         """
         从新浪财经获取分钟级分时数据
@@ -94,26 +357,13 @@ class RealtimeDataFetcher:
                 'datalen': days * 240  # 一天约240分钟
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data:
-                    df = pd.DataFrame(data)
-                    
-                    # 根据实际列数动态设置列名
-                    if len(df.columns) >= 6:
-                        df.columns = ['时间', '开盘价', '最高价', '最低价', '收盘价', '成交量'] + list(df.columns[6:])
-                    
-                    # 转换数据类型
-                    for col in ['开盘价', '最高价', '最低价', '收盘价', '成交量']:
-                        if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce')
-                    
-                    # 转换时间格式
-                    if '时间' in df.columns:
-                        df['时间'] = pd.to_datetime(df['时间'])
-                        df = df.sort_values('时间')
+                    # 按字段名构造标准OHLCV格式（均线字段不输出）
+                    df = parse_sina_klines(data, time_column='时间', time_format=SINA_MINUTE_FORMAT)
                     
                     return df
             return None
@@ -141,32 +391,13 @@ class RealtimeDataFetcher:
                 'lmt': days * 240
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('data') and data['data'].get('klines'):
-                    klines = data['data']['klines']
-                    rows = []
-                    for line in klines:
-                        parts = line.split(',')
-                        rows.append({
-                            '时间': parts[0],
-                            '开盘价': float(parts[1]),
-                            '收盘价': float(parts[2]),
-                            '最高价': float(parts[3]),
-                            '最低价': float(parts[4]),
-                            '成交量': float(parts[5]),
-                            '成交额': float(parts[6]),
-                            '振幅': float(parts[7]),
-                            '涨跌幅': float(parts[8]),
-                            '涨跌额': float(parts[9]),
-                            '换手率': float(parts[10])
-                        })
-                    
-                    df = pd.DataFrame(rows)
-                    df['时间'] = pd.to_datetime(df['时间'])
-                    df = df.sort_values('时间')
+                    df = parse_eastmoney_klines(data['data']['klines'], time_column='时间',
+                                                time_format=EASTMONEY_MINUTE_FORMAT)
                     
                     return df
             return None
@@ -181,6 +412,9 @@ class RealtimeDataFetcher:
         data_type: 'realtime-test' - 实时价格, 'minute' - 分钟数据
         """
         if data_type == 'realtime-test':
+            if self.cache is not None:
+                key = SnapshotCache.make_key('sina', stock_code, 'realtime')
+                return self.cache.get_or_fetch(key, lambda: self.get_sina_realtime_data(stock_code))
             return self.get_sina_realtime_data(stock_code)
         else:
             print("不支持的数据类型")
@@ -189,25 +423,44 @@ class RealtimeDataFetcher:
     def get_minute_data(self, stock_code: str, days: int = 1, data_source: str = 'auto') -> Optional[pd.DataFrame]:
         """
         获取分钟级分时数据
+        data_source: 'sina', 'eastmoney', 'auto', 'race'
+        设置了分钟K线仓库时，获取到的数据会合并保存到仓库中
         """
         print(f"正在获取 {stock_code} 的 {days} 天分钟数据...")
-        
+
+        df = self._fetch_minute_data(stock_code, days, data_source)
+        if self.minute_store is not None and df is not None and not df.empty:
+            self.minute_store.merge(stock_code, df)
+        return df
+
+    def _fetch_minute_data(self, stock_code: str, days: int, data_source: str) -> Optional[pd.DataFrame]:
+        """按数据源从网络获取分钟数据"""
+        sources = [
+            ('新浪财经', self.get_sina_minute_data),
+            ('东方财富', self.get_eastmoney_minute_data)
+        ]
+
+        # 与 MinuteDataFetcher 的分钟K线（'minute'）接口不同，健康度分开统计
+        if self.health is not None:
+            sources = self.health.order('realtime_minute', sources)
+
+        if data_source == 'race':
+            return self._race_sources('realtime_minute', sources, stock_code, days)
+
         if data_source == 'auto':
             # 自动选择数据源
-            sources = [
-                ('新浪财经', self.get_sina_minute_data),
-                ('东方财富', self.get_eastmoney_minute_data)
-            ]
-            
             for source_name, source_func in sources:
                 print(f"尝试从 {source_name} 获取数据...")
+                started = time.time()
                 df = source_func(stock_code, days)
+                if self.health is not None:
+                    self.health.record_result('realtime_minute', source_name, df, time.time() - started)
                 if df is not None and not df.empty:
                     print(f"✅ 成功从 {source_name} 获取到 {len(df)} 条数据")
+                    self.last_source = source_name
                     return df
                 else:
                     print(f"❌ 从 {source_name} 获取数据失败")
-                    time.sleep(1)
             
             print("❌ 所有数据源都无法获取数据")
             return None
@@ -227,7 +480,30 @@ class RealtimeDataFetcher:
         
         df.to_csv(filename, index=False, encoding='utf-8-sig')
         print(f"✅ 数据已保存到: {filename}")
+
+    def save_to_columnar(self, df: pd.DataFrame, stock_code: str, filename: str = None, fmt: str = 'parquet'):
+        """
+        保存数据到列式文件（保留数值和时间类型，体积小、加载快）
+        fmt: 'parquet'、'feather' 或 'npz'，未安装 pyarrow 时回退为 npz；读取使用 columnar_io.read_columnar
+        """
+        if filename is None:
+            filename = f"{stock_code}_minute_data_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}{extension_for(fmt)}"
+
+        write_columnar(df, filename)
+        print(f"✅ 数据已保存到: {filename}")
     
+    def save_partitioned(self, df: pd.DataFrame, stock_code: str,
+                         root_dir: str = 'data', fmt: str = 'parquet') -> int:
+        """
+        追加保存到按 股票/周期/年月 分区的仓库，只写入新增或被修正的K线
+        与按时间戳命名的一次性文件不同，重复保存不会产生重复数据；读取使用 PartitionedKlineWriter.read
+        返回改写的分区数
+        """
+        writer = PartitionedKlineWriter(root_dir, time_column='时间', fmt=fmt)
+        written = writer.append(stock_code, '1min', df)
+        print(f"✅ 数据已追加到: {os.path.join(root_dir, stock_code, '1min')} (改写 {written} 个分区)")
+        return written
+
     def save_to_json(self, data: Dict, stock_code: str, filename: str = None):
         """保存实时数据到JSON文件"""
         if filename is None:
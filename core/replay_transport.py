@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP响应录制与回放
+与 HttpTransport 接口一致，可直接传给各数据获取器的 transport 参数：
+  record 模式：通过真实的 HttpTransport 请求，并把原始响应保存到 fixture_dir
+  replay 模式：不访问网络，从 fixture_dir 返回已录制的响应，可模拟延迟和抖动
+
+录制目录结构：
+  index.json                 请求键到响应元数据（状态码、编码、响应头、blob）的映射
+  blobs/ab/abcdef....gz      以内容 SHA-256 命名的 gzip 压缩响应体，相同内容只保存一份
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    from .http_transport import HttpTransport
+except ImportError:
+    from http_transport import HttpTransport
+
+
+# 每次请求都会变化、不影响响应内容的参数（时间戳、时间范围），生成请求键时忽略
+DEFAULT_IGNORED_PARAMS = ('_', 'period1', 'period2')
+
+# 录制时保留的响应头（响应体以解码后的形式保存，不保留 Content-Encoding）
+_KEPT_HEADERS = ('Content-Type', 'Date', 'Last-Modified', 'ETag')
+
+
+class ReplayTransport:
+    def __init__(self, fixture_dir: str, mode: str = 'replay', transport: Optional[HttpTransport] = None,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None,
+                 ignored_params: Iterable[str] = DEFAULT_IGNORED_PARAMS):
+        """
+        fixture_dir: 录制数据目录
+        mode: 'record' 录制，'replay' 回放
+        transport: record 模式下实际发送请求的传输层，默认新建 HttpTransport
+        latency_ms / jitter_ms: replay 模式下每次请求的模拟延迟及其均匀抖动范围（毫秒）
+        seed: 抖动的随机种子，固定后回放的延迟序列可重复
+        ignored_params: 生成请求键时忽略的查询参数
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"不支持的模式: {mode}")
+
+        self.fixture_dir = fixture_dir
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ignored_params = frozenset(ignored_params)
+        self.transport = transport or (HttpTransport() if mode == 'record' else None)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(fixture_dir, 'index.json')
+        self._blob_cache: Dict[str, bytes] = {}
+        self._dirty = False
+        # 回放时已返回的响应体字节数
+        self.bytes_served = 0
+
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        elif mode == 'replay':
+            raise FileNotFoundError(f"录制数据不存在: {self._index_path}")
+        else:
+            self.index = {}
+
+        if mode == 'replay':
+            # 预先解压全部响应体，回放时只做内存查找
+            for entry in self.index.values():
+                self._load_blob(entry['blob'])
+
+    def request_key(self, url: str, params: Optional[Dict] = None) -> str:
+        """由URL和查询参数生成与参数顺序无关的请求键"""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if params:
+            query.extend((str(k), str(v)) for k, v in params.items())
+        query = sorted((k, v) for k, v in query if k not in self.ignored_params)
+        key = f"{parts.scheme}://{parts.netloc}{parts.path}"
+        return f"{key}?{urlencode(query)}" if query else key
+
+    def timeout_for(self, url: str) -> float:
+        if self.transport is not None:
+            return self.transport.timeout_for(url)
+        return 0
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        key = self.request_key(url, params)
+        if self.mode == 'record':
+            response = self.transport.get(url, params=params, headers=headers, timeout=timeout)
+            self._record(key, response)
+            return response
+        return self._replay(key)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.fixture_dir, 'blobs', digest[:2], f"{digest}.gz")
+
+    def _load_blob(self, digest: str) -> bytes:
+        content = self._blob_cache.get(digest)
+        if content is None:
+            with gzip.open(self._blob_path(digest), 'rb') as f:
+                content = f.read()
+            self._blob_cache[digest] = content
+        return content
+
+    def _record(self, key: str, response: requests.Response):
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp{threading.get_ident()}"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self.index[key] = {
+                'status': response.status_code,
+                'encoding': response.encoding,
+                'headers': {h: response.headers[h] for h in _KEPT_HEADERS if h in response.headers},
+                'blob': digest,
+                'size': len(content),
+            }
+            self._dirty = True
+
+    def _replay(self, key: str) -> requests.Response:
+        entry = self.index.get(key)
+        if entry is None:
+            raise LookupError(f"录制数据中没有该请求: {key}")
+
+        if self.latency_ms or self.jitter_ms:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response._content = self._blob_cache[entry['blob']]
+        response.encoding = entry['encoding']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = key
+        with self._lock:
+            self.bytes_served += len(response._content)
+        return response
+
+    def flush(self):
+        """将录制的索引写入磁盘"""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.fixture_dir, exist_ok=True)
+            tmp_path = f"{self._index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self._index_path)
+            self._dirty = False
+
+    def close(self):
+        """写入索引并关闭底层传输层"""
+        self.flush()
+        if self.transport is not None:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新浪财经批量行情（hq.sinajs.cn/list 接口）
+一次请求可带数百个代码，返回文本中每只股票一行 var hq_str_xxx="...";
+实时行情、五档盘口和财务快照共用同一请求和拆分逻辑，由各获取器按需解析字段
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+SINA_LIST_URL = "http://hq.sinajs.cn/list="
+
+# 单次请求的最大代码数（受URL长度限制）
+SINA_BATCH_SIZE = 800
+
+
+def iter_sina_records(text: str) -> Iterator[Tuple[str, List[str]]]:
+    """逐行拆分新浪返回文本，产出 (股票代码, 字段列表)"""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith('var hq_str_'):
+            continue
+
+        head, _, rest = line.partition('="')
+        stock_code = head[len('var hq_str_'):]
+        data_part = rest.rsplit('"', 1)[0]
+        if not data_part:
+            # 无效代码或停牌时新浪返回空字符串
+            continue
+        yield stock_code, data_part.split(',')
+
+
+def fetch_sina_texts(transport, stock_codes: List[str], headers: Dict,
+                     batch_size: int = SINA_BATCH_SIZE) -> Iterator[str]:
+    """按 batch_size 分组请求新浪 list 接口，逐个产出响应文本；请求失败的分组跳过"""
+    # 去重并保持原有顺序
+    codes = list(dict.fromkeys(stock_codes))
+
+    for start in range(0, len(codes), batch_size):
+        chunk = codes[start:start + batch_size]
+        try:
+            response = transport.get(SINA_LIST_URL + ','.join(chunk), headers=headers)
+
+            if response.status_code == 200 and response.text.strip():
+                yield response.text
+            else:
+                print(f"❌ 新浪批量请求失败 ({len(chunk)} 个代码): HTTP {response.status_code}")
+
+        except Exception as e:
+            print(f"获取新浪批量行情失败 ({len(chunk)} 个代码): {e}")
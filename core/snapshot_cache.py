@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情/财务快照缓存
+按 (数据源, 股票代码, 数据类型) 缓存结果，支持按数据类型设置TTL、LRU容量上限，
+并合并同一键的并发请求，只向网络发出一次请求
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _InflightRequest:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SnapshotCache:
+    # 各数据类型默认的缓存有效期（秒）
+    DEFAULT_TTLS = {
+        'realtime': 2.0,
+        'financial': 300.0,
+    }
+
+    def __init__(self, max_size: int = 10000, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 1.0):
+        """
+        max_size: 最多缓存的条目数，超出后淘汰最久未使用的条目
+        ttls: 按数据类型覆盖的有效期（秒）
+        default_ttl: 未配置数据类型的有效期（秒）
+        """
+        self.max_size = max_size
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[Hashable, _InflightRequest] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(source: str, stock_code: str, data_type: str) -> Tuple[str, str, str]:
+        return (source, stock_code, data_type)
+
+    def ttl_for(self, data_type: str) -> float:
+        return self.ttls.get(data_type, self.default_ttl)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Any]:
+        """返回未过期的缓存值，不存在或已过期时返回 None"""
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Tuple[str, str, str], value: Any):
+        """写入缓存，有效期由键中的数据类型决定"""
+        with self._lock:
+            self._set_locked(key, value)
+
+    def _set_locked(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl_for(key[2]), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key: Tuple[str, str, str], fetch_func: Callable[[], Any]) -> Any:
+        """
+        命中缓存时直接返回；否则调用 fetch_func 获取
+        同一键的并发调用共享同一次请求的结果，结果为 None 时不写入缓存
+        缓存返回的是共享对象，调用方不应修改
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+
+            inflight = self._inflight.get(key)
+            is_leader = inflight is None
+            if is_leader:
+                inflight = _InflightRequest()
+                self._inflight[key] = inflight
+
+        if not is_leader:
+            inflight.event.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.result
+
+        try:
+            inflight.result = fetch_func()
+        except BaseException as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                if inflight.error is None and inflight.result is not None:
+                    self._set_locked(key, inflight.result)
+                del self._inflight[key]
+            inflight.event.set()
+
+        return inflight.result
+
+    def invalidate(self, key: Optional[Tuple[str, str, str]] = None):
+        """删除指定键；key 为 None 时清空缓存"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
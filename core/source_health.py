@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据源健康度统计
+按 (数据类型, 数据源) 记录成功率、延迟和数据质量的指数加权移动平均（EWMA），
+据此估算每个数据源的期望代价，auto/race 模式按代价从低到高尝试数据源。
+统计结果可保存为JSON，重启后继续使用
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def data_quality_score(result: Any) -> float:
+    """
+    数据质量评分（0~100）
+    DataFrame：检查OHLCV必要列、收盘价空值、最高价小于最低价、非正价格和日K线的长时间断档
+    字典：按有效字段（非空、非 '-'、非 'N/A'、非0）所占比例评分
+    """
+    if result is None:
+        return 0.0
+
+    if isinstance(result, pd.DataFrame):
+        if result.empty:
+            return 0.0
+        score = 100.0
+        required = ['开盘价', '最高价', '最低价', '收盘价', '成交量']
+        if any(col not in result.columns for col in required):
+            return 80.0 if '收盘价' in result.columns else 0.0
+
+        close = result['收盘价'].to_numpy(dtype=float)
+        if np.isnan(close).any():
+            score -= 10
+        if (result['最高价'] < result['最低价']).any():
+            score -= 10
+        if (close <= 0).any():
+            score -= 10
+        if '日期' in result.columns and len(result) > 1:
+            gaps = result['日期'].sort_values().diff().dt.days
+            if (gaps > 7).any():
+                score -= 5
+        return max(0.0, score)
+
+    if isinstance(result, dict):
+        if not result:
+            return 0.0
+        valid = sum(1 for v in result.values() if v not in (None, '', '-', 'N/A', 0, '0'))
+        return 100.0 * valid / len(result)
+
+    return 100.0
+
+
+class SourceHealthTracker:
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.2, prior_latency: float = 1.0,
+                 quality_penalty: float = 2.0, autosave_interval: float = 30.0,
+                 quality_func: Callable[[Any], float] = data_quality_score):
+        """
+        path: 统计结果的JSON文件路径，为 None 时不持久化
+        alpha: EWMA 平滑系数，越大越偏重最近的请求
+        prior_latency: 没有统计数据的数据源的假定延迟（秒）
+        quality_penalty: 质量为0时附加的代价（秒），按质量线性折算
+        autosave_interval: 自动保存的最小间隔（秒）
+        quality_func: 结果质量评分函数，返回 0~100
+        """
+        self.path = path
+        self.alpha = alpha
+        self.prior_latency = prior_latency
+        self.quality_penalty = quality_penalty
+        self.autosave_interval = autosave_interval
+        self.quality_func = quality_func
+        self.stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+        self._last_save = time.time()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取数据源健康度统计失败，将重新统计: {e}")
+        if path:
+            atexit.register(self.save)
+
+    def record(self, data_type: str, source_name: str, success: bool, latency: float,
+               quality: Optional[float] = None):
+        """记录一次请求的结果"""
+        with self._lock:
+            stat = self.stats.setdefault(data_type, {}).get(source_name)
+            if stat is None:
+                stat = {'success_rate': 1.0 if success else 0.0, 'latency': latency,
+                        'quality': quality if quality is not None else 100.0, 'count': 0}
+                self.stats[data_type][source_name] = stat
+            else:
+                a = self.alpha
+                stat['success_rate'] = (1 - a) * stat['success_rate'] + a * (1.0 if success else 0.0)
+                stat['latency'] = (1 - a) * stat['latency'] + a * latency
+                if quality is not None:
+                    stat['quality'] = (1 - a) * stat['quality'] + a * quality
+            stat['count'] += 1
+            stat['updated'] = time.time()
+            should_save = self.path and time.time() - self._last_save >= self.autosave_interval
+
+        if should_save:
+            self.save()
+
+    def record_result(self, data_type: str, source_name: str, result: Any, latency: float):
+        """根据获取结果记录：结果为空视为失败，成功时计算数据质量"""
+        quality = self.quality_func(result)
+        success = quality > 0
+        self.record(data_type, source_name, success, latency, quality if success else None)
+
+    def expected_cost(self, data_type: str, source_name: str) -> float:
+        """
+        期望代价（秒）：延迟 / 成功率 + 质量扣分
+        成功率越低需要的重试越多，质量越低越应排在后面
+        """
+        stat = self.stats.get(data_type, {}).get(source_name)
+        if stat is None:
+            return self.prior_latency
+        success_rate = max(stat['success_rate'], 0.05)
+        penalty = (1 - stat['quality'] / 100) * self.quality_penalty
+        return stat['latency'] / success_rate + penalty
+
+    def order(self, data_type: str, sources: List[Tuple[str, Callable]]) -> List[Tuple[str, Callable]]:
+        """按期望代价从低到高排列数据源，代价相同时保持原有顺序"""
+        with self._lock:
+            return sorted(sources, key=lambda source: self.expected_cost(data_type, source[0]))
+
+    def ranking(self, data_type: str) -> List[Tuple[str, float]]:
+        """返回某数据类型下各数据源及其期望代价，按代价排序"""
+        with self._lock:
+            names = list(self.stats.get(data_type, {}))
+            return sorted(((name, self.expected_cost(data_type, name)) for name in names), key=lambda x: x[1])
+
+    def save(self):
+        """保存统计结果到JSON文件"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self.stats, ensure_ascii=False, indent=2)
+            self._last_save = time.time()
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存数据源健康度统计失败: {e}")
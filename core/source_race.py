@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据源竞速（对冲请求）
+立即请求首选数据源，若在对冲延迟内未返回有效结果则并行请求下一个数据源，
+返回最先得到的有效结果。
+MultiSourceFetcher 为各数据获取器共用的数据源状态（传输层、调度器、健康度统计）和 race 模式实现
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .http_transport import HttpTransport
+    from .source_health import SourceHealthTracker
+except ImportError:
+    from http_transport import HttpTransport
+    from source_health import SourceHealthTracker
+
+
+def is_valid_result(result) -> bool:
+    """DataFrame 非空或其他结果非 None 即视为有效"""
+    if isinstance(result, pd.DataFrame):
+        return not result.empty
+    return result is not None
+
+
+class SourceRacer:
+    def __init__(self, hedge_delay: Optional[float] = None, default_hedge_delay: float = 1.0,
+                 max_workers: int = 8, latency_window: int = 100):
+        """
+        hedge_delay: 固定对冲延迟（秒）；为 None 时使用各数据源历史延迟的 p95
+        default_hedge_delay: 样本不足时使用的对冲延迟（秒）
+        max_workers: 执行请求的线程数，落败的请求会在后台跑完
+        latency_window: 每个数据源保留的延迟样本数
+        """
+        self.hedge_delay = hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.latency_window = latency_window
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self.wins: Dict[str, int] = {}
+
+    def record_latency(self, source_name: str, seconds: float):
+        """记录一次成功请求的延迟"""
+        with self._lock:
+            samples = self._latencies.setdefault(source_name, deque(maxlen=self.latency_window))
+            samples.append(seconds)
+
+    def hedge_delay_for(self, source_name: str) -> float:
+        """返回在发出对冲请求前等待该数据源的时间"""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        with self._lock:
+            samples = sorted(self._latencies.get(source_name, ()))
+        if len(samples) < 5:
+            return self.default_hedge_delay
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def race(self, sources: List[Tuple[str, Callable]], *args,
+             is_valid: Callable[[Any], bool] = is_valid_result,
+             on_result: Optional[Callable[[str, Any, float], None]] = None) -> Tuple[Any, Optional[str]]:
+        """
+        按顺序对冲请求各数据源
+        返回 (结果, 获胜数据源名称)，全部失败时返回 (None, None)
+        on_result: 每个数据源返回（含失败，结果为 None）时调用 on_result(数据源名称, 结果, 耗时秒)；
+                   有数据源获胜时仍未返回的数据源按失败（结果为 None）回调，耗时为已等待的时间
+        """
+        pending = {}
+        next_index = 0
+        last_launched = None
+
+        def launch():
+            nonlocal next_index, last_launched
+            source_name, source_func = sources[next_index]
+            next_index += 1
+            last_launched = source_name
+            future = self.executor.submit(source_func, *args)
+            pending[future] = (source_name, time.time())
+
+        launch()
+        while pending:
+            timeout = self.hedge_delay_for(last_launched) if next_index < len(sources) else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # 超过对冲延迟仍未返回，发出下一个数据源的请求
+                launch()
+                continue
+
+            for future in done:
+                source_name, started = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {source_name} 请求异常: {e}")
+                    result = None
+                if on_result is not None:
+                    on_result(source_name, result, time.time() - started)
+
+                if is_valid(result):
+                    self.record_latency(source_name, time.time() - started)
+                    for loser, (loser_name, loser_started) in pending.items():
+                        loser.cancel()
+                        if on_result is not None:
+                            # 未返回的数据源（可能已挂起）不再等待，按失败记录，避免其健康度一直不变
+                            on_result(loser_name, None, time.time() - loser_started)
+                    with self._lock:
+                        self.wins[source_name] = self.wins.get(source_name, 0) + 1
+                    return result, source_name
+
+            # 已返回的数据源均无效，不再等待，立即请求下一个
+            if next_index < len(sources):
+                launch()
+
+        return None, None
+
+    def close(self):
+        """关闭线程池，不等待后台落败请求"""
+        self.executor.shutdown(wait=False)
+
+
+class MultiSourceFetcher:
+    """多数据源获取器的公共部分，子类在 __init__ 中调用 _init_sources"""
+
+    def _init_sources(self, transport: Optional[HttpTransport], racer: Optional[SourceRacer],
+                      health: Optional[SourceHealthTracker]):
+        # 共享连接池的HTTP传输层，多个获取器可传入同一实例复用连接
+        self.transport = transport or HttpTransport()
+        # race 模式使用的对冲请求调度器，按需创建
+        self.racer = racer
+        # 最近一次 auto/race 模式实际返回数据的数据源
+        self.last_source = None
+        # 数据源健康度统计，设置后 auto/race 模式按期望代价排列数据源
+        self.health = health
+
+    def _race_sources(self, data_type: str, sources: List[Tuple[str, Callable]], *args):
+        """
+        对冲请求各数据源，返回最先得到的有效结果并记录获胜数据源
+        设置了健康度统计时，每个返回的数据源（含落败和失败的）都按 data_type 记录结果和耗时，
+        其他数据源获胜时仍未返回的数据源记为失败
+        """
+        if self.racer is None:
+            self.racer = SourceRacer()
+
+        on_result = None
+        if self.health is not None:
+            def on_result(source_name, result, elapsed):
+                self.health.record_result(data_type, source_name, result, elapsed)
+
+        result, winner = self.racer.race(sources, *args, on_result=on_result)
+        self.last_source = winner
+        if winner is not None:
+            print(f"✅ {winner} 率先返回有效数据")
+        else:
+            print("❌ 所有数据源都无法获取数据")
+        return result
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A股交易时段判断
+行情在 09:15 集合竞价开始更新，11:30~13:00 午休及 15:00 收盘后不再变化，
+轮询行情前据此判断是否需要发出请求，以及距离下一个交易时段还有多久。
+只排除周末，不包含法定节假日；节假日轮询时行情时间不会前进，条件刷新不会产出重复记录
+"""
+
+import datetime
+from typing import Optional
+
+# 交易所时间为北京时间
+CHINA_TZ = datetime.timezone(datetime.timedelta(hours=8))
+
+# 行情会更新的时段（含集合竞价）
+SESSIONS = (
+    (datetime.time(9, 15), datetime.time(11, 30)),
+    (datetime.time(13, 0), datetime.time(15, 0)),
+)
+
+# 时段结束后继续轮询的秒数，用于取到收盘/午休前最后一笔行情
+CLOSE_GRACE_SECONDS = 60
+
+
+def china_now() -> datetime.datetime:
+    """当前北京时间（不带时区信息）"""
+    return datetime.datetime.now(CHINA_TZ).replace(tzinfo=None)
+
+
+def is_trading_time(now: Optional[datetime.datetime] = None) -> bool:
+    """now 为北京时间，为 None 时取当前时间"""
+    if now is None:
+        now = china_now()
+    if now.weekday() >= 5:
+        return False
+    for start, end in SESSIONS:
+        session_start = datetime.datetime.combine(now.date(), start)
+        session_end = datetime.datetime.combine(now.date(), end) + datetime.timedelta(seconds=CLOSE_GRACE_SECONDS)
+        if session_start <= now <= session_end:
+            return True
+    return False
+
+
+def seconds_until_next_session(now: Optional[datetime.datetime] = None) -> float:
+    """距离下一个交易时段开始的秒数，处于交易时段时返回0"""
+    if now is None:
+        now = china_now()
+    if is_trading_time(now):
+        return 0.0
+
+    day = now.date()
+    for _ in range(8):
+        if day.weekday() < 5:
+            for start, _end in SESSIONS:
+                session_start = datetime.datetime.combine(day, start)
+                if session_start > now:
+                    return (session_start - now).total_seconds()
+        day += datetime.timedelta(days=1)
+    return 0.0
+
+
+def last_closed_trading_day(now: Optional[datetime.datetime] = None) -> datetime.date:
+    """最近一个已收盘的交易日（只排除周末），now 为北京时间，为 None 时取当前时间"""
+    if now is None:
+        now = china_now()
+    today = now.date()
+    if today.weekday() < 5 and now.time() >= SESSIONS[-1][1]:
+        return today
+    day = today - datetime.timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= datetime.timedelta(days=1)
+    return day
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+腾讯财经快照解析性能对比
+比较每次解析都重新定义 safe_float 闭包的旧方式、字段解析器逐条解析和按列批量解析的耗时，
+以及构造 FinancialQuote 时旧方式与 parse_tencent_quotes（get_tencent_financial_quotes_batch 使用的按列方式）
+的耗时；使用本地生成的数据，不访问网络；按列构造未明显快于旧方式时以断言失败退出
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+from financial_data_fetcher import FinancialDataFetcher, TENCENT_FIELDS
+from quote_records import FinancialQuote, TENCENT_TIME_FORMAT, exchange_timestamp
+
+
+def generate_records(count=5000):
+    """生成与腾讯财经 qt.gtimg.cn 字段位置一致的测试记录"""
+    records = []
+    for i in range(count):
+        price = 5 + (i % 500) / 10
+        fields = ['0'] * 50
+        fields[1] = f"股票{i}"
+        fields[3], fields[4], fields[5] = f"{price:.2f}", f"{price - 0.1:.2f}", f"{price - 0.05:.2f}"
+        fields[6] = str(10000 + i)
+        fields[30] = f"20240102{93000 + i % 60:06d}"
+        fields[31], fields[32] = "0.10", f"{0.1 / price * 100:.2f}"
+        fields[33], fields[34] = f"{price + 0.2:.2f}", f"{price - 0.2:.2f}"
+        fields[36] = str(10000 + i)
+        fields[37] = f"{(10000 + i) * price / 100:.2f}"
+        fields[38], fields[39] = "1.23", "15.2"
+        fields[44], fields[45], fields[46] = f"{price * 10:.2f}", f"{price * 12:.2f}", "1.3"
+        if i % 50 == 0:
+            fields[39] = ''  # 亏损股票市盈率为空
+        records.append(fields)
+    return records
+
+
+def legacy_parse(stock_data):
+    """旧版解析（与重构前的实现一致，字段位置已按 TENCENT_FIELDS 修正）"""
+    def safe_float(value, default=0):
+        try:
+            return float(value) if value and value != '' else default
+        except (ValueError, TypeError):
+            return default
+
+    def safe_int(value, default=0):
+        try:
+            return int(float(value)) if value and value != '' else default
+        except (ValueError, TypeError):
+            return default
+
+    return {
+        'name': stock_data[1],
+        'price': safe_float(stock_data[3]),
+        'pre_close': safe_float(stock_data[4]),
+        'open': safe_float(stock_data[5]),
+        'volume': safe_int(stock_data[6]) * 100,  # 与 TENCENT_FIELDS 一致，手转换为股
+        'change': safe_float(stock_data[31]),
+        'change_percent': safe_float(stock_data[32]),
+        'high': safe_float(stock_data[33]),
+        'low': safe_float(stock_data[34]),
+        'amount': safe_float(stock_data[37]) * 10000,
+        'turnover_rate': safe_float(stock_data[38]),
+        'pe': safe_float(stock_data[39]),
+        'pb': safe_float(stock_data[46]),
+        'float_market_cap': safe_float(stock_data[44]) * 100000000,
+        'total_market_cap': safe_float(stock_data[45]) * 100000000,
+    }
+
+
+def legacy_quotes(codes, records):
+    """旧版逐条构造 FinancialQuote（每条记录先解析为字典再作为关键字参数传入）"""
+    fetched_at = time.time()
+    return {
+        stock_code: FinancialQuote(code=stock_code, source='腾讯财经', fetched_at=fetched_at,
+                                   exchange_time=exchange_timestamp(stock_data[30], TENCENT_TIME_FORMAT),
+                                   **legacy_parse(stock_data))
+        for stock_code, stock_data in zip(codes, records)
+    }
+
+
+# 按列构造 FinancialQuote 相对旧版的最低加速比
+MIN_SPEEDUP = 1.3
+
+
+def timed(func, repeat=7):
+    """返回最短耗时（毫秒，减少机器负载波动的影响）和最后一次的返回值"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    records = generate_records()
+    print(f"🚀 腾讯财经快照解析对比（{len(records)} 只股票）")
+    print("=" * 60)
+
+    legacy_ms, legacy = timed(lambda: [legacy_parse(r) for r in records])
+    compiled_ms, compiled = timed(lambda: [TENCENT_FIELDS.parse(r) for r in records])
+    bulk_ms, bulk = timed(lambda: TENCENT_FIELDS.parse_many(records))
+
+    # 构造行情（不含响应文本拆分，两种方式拆分相同）
+    codes = [f"sz{i:06d}" for i in range(len(records))]
+    legacy_quotes_ms, expected_quotes = timed(lambda: legacy_quotes(codes, records))
+    quotes_ms, quotes = timed(lambda: FinancialDataFetcher._build_tencent_quotes(codes, records))
+
+    fetcher = FinancialDataFetcher()
+    text = ''.join(f'v_{code}="{"~".join(r)}";\n' for code, r in zip(codes, records))
+    text_ms, parsed = timed(lambda: fetcher.parse_tencent_quotes(text))
+    assert parsed.keys() == quotes.keys()
+
+    # 校验各方式结果一致（换算系数按乘法计算，允许浮点误差）
+    for name in TENCENT_FIELDS.names:
+        for i in (0, 50, len(records) - 1):
+            expected = legacy[i][name]
+            for value in (compiled[i][name], bulk[name][i]):
+                assert value == expected or math.isclose(value, expected), (name, i)
+    assert quotes.keys() == expected_quotes.keys()
+    for code in list(quotes)[::50]:
+        for name in FinancialQuote.__slots__:
+            if name == 'fetched_at':
+                continue
+            value, expected = getattr(quotes[code], name), getattr(expected_quotes[code], name)
+            assert value == expected or math.isclose(value, expected), (code, name)
+
+    print(f"旧版闭包解析:       {legacy_ms:8.2f} ms  ({legacy_ms / len(records) * 1000:.2f} µs/只)")
+    print(f"逐条解析:           {compiled_ms:8.2f} ms  ({compiled_ms / len(records) * 1000:.2f} µs/只)")
+    print(f"按列批量解析:       {bulk_ms:8.2f} ms  ({bulk_ms / len(records) * 1000:.2f} µs/只)")
+    print(f"旧版构造行情:       {legacy_quotes_ms:8.2f} ms  ({legacy_quotes_ms / len(records) * 1000:.2f} µs/只)")
+    print(f"按列构造行情:       {quotes_ms:8.2f} ms  ({quotes_ms / len(records) * 1000:.2f} µs/只)")
+    print(f"含文本拆分:         {text_ms:8.2f} ms  ({text_ms / len(records) * 1000:.2f} µs/只)")
+
+    speedup = legacy_quotes_ms / quotes_ms
+    assert speedup >= MIN_SPEEDUP, f"按列构造行情只比旧版快 {speedup:.2f} 倍，低于 {MIN_SPEEDUP} 倍"
+    print(f"✅ 按列构造行情比旧版快 {speedup:.2f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -99,8 +99,6 @@ def test_fixed_version():
                 print(f"❌ {source_name} 异常: {e}")
                 results[source_name] = None
 
-            time.sleep(1)  # 避免请求过于频繁
-
         # 保存结果
         filename = f"{stock_code}_fixed_test_{time.strftime('%Y%m%d_%H%M%S')}.json"
         with open(filename, 'w', encoding='utf-8') as f:
@@ -202,6 +200,29 @@ def test_single_stock_detailed(stock_code="sz000002"):
         print("❌ 新浪财经数据获取失败")
 
 
+def test_consensus_snapshot(stock_codes=("sz000002", "sh600000", "sz000001")):
+    """并发批量请求三个数据源，显示共识快照及每个字段的来源"""
+
+    print("🔍 共识快照测试")
+    print("=" * 80)
+
+    fetcher = FinancialDataFetcher()
+    start_time = time.time()
+    result = fetcher.get_consensus_snapshot(list(stock_codes))
+    print(f"响应时间: {time.time() - start_time:.3f}秒")
+
+    if result is None:
+        print("❌ 共识快照获取失败")
+        return
+
+    merged, provenance = result
+    for stock_code in merged.index:
+        row = merged.loc[stock_code]
+        print(f"\n📊 {stock_code} {row['name']}（{row['sources']} 个数据源）")
+        for field in ('price', 'turnover_rate', 'pe', 'pb', 'total_market_cap', 'float_market_cap'):
+            print(f"  {field}: {row[field]}  ← {provenance.loc[stock_code, field] or '无'}")
+
+
 def main():
     """主函数"""
     print("🎯 修复版本财务数据获取器测试工具")
@@ -211,9 +232,10 @@ def main():
         print("\n请选择测试模式:")
         print("1. 测试所有数据源（多股票对比）")
         print("2. 详细测试单个股票")
-        print("3. 退出")
+        print("3. 共识快照（三个数据源并发）")
+        print("4. 退出")
 
-        choice = input("\n请输入选择 (1-3): ").strip()
+        choice = input("\n请输入选择 (1-4): ").strip()
 
         if choice == '1':
             test_fixed_version()
@@ -223,6 +245,8 @@ def main():
                 stock_code = "sz000002"
             test_single_stock_detailed(stock_code)
         elif choice == '3':
+            test_consensus_snapshot()
+        elif choice == '4':
             print("👋 再见！")
             break
         else:
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV/JSON 与列式文件的写入、读取耗时和文件大小对比
+使用本地生成的1分钟K线数据，不访问网络
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+from columnar_io import HAS_PYARROW, read_columnar, write_columnar
+from eastmoney_parse_benchmark import generate_klines, vectorized_parse
+import pandas as pd
+
+
+def write_csv(df, path):
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def read_csv(path):
+    return pd.read_csv(path, encoding='utf-8-sig', parse_dates=['时间'])
+
+
+def write_json(df, path):
+    df_copy = df.copy()
+    df_copy['时间'] = df_copy['时间'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(df_copy.to_dict('records'), f, ensure_ascii=False, indent=2)
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        df = pd.DataFrame(json.load(f))
+    df['时间'] = pd.to_datetime(df['时间'])
+    return df
+
+
+def timed(func, *args, repeat=5):
+    """返回平均耗时（毫秒）和最后一次的返回值"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    print("🚀 K线文件格式对比（1023条1分钟K线 × 1只股票）")
+    print(f"pyarrow: {'已安装' if HAS_PYARROW else '未安装，列式格式仅测试 .npz'}")
+    print("=" * 60)
+
+    df = vectorized_parse(generate_klines(1023))
+    formats = [
+        ('CSV', '.csv', write_csv, read_csv),
+        ('JSON', '.json', write_json, read_json),
+        ('NPZ', '.npz', write_columnar, read_columnar),
+    ]
+    if HAS_PYARROW:
+        formats += [
+            ('Parquet', '.parquet', write_columnar, read_columnar),
+            ('Feather', '.feather', write_columnar, read_columnar),
+        ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'格式':<10}{'写入(ms)':>10}{'读取(ms)':>10}{'大小(KB)':>10}")
+        print("-" * 40)
+        for name, ext, writer, reader in formats:
+            path = os.path.join(tmp_dir, f"data{ext}")
+            write_ms, _ = timed(writer, df, path)
+            read_ms, loaded = timed(reader, path)
+            assert len(loaded) == len(df)
+            size_kb = os.path.getsize(path) / 1024
+            print(f"{name:<10}{write_ms:>10.2f}{read_ms:>10.2f}{size_kb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K线数据源并发性能基准测试
+在本地启动模拟HTTP服务器提供固定的K线数据，通过 HttpTransport 的 host_overrides
+把各数据源的请求转发到本地，在不同并发数下统计：
+  p50/p95/p99 延迟、每秒请求数、错误率、传输字节数
+不访问网络，结果可重复；--latency-ms / --error-rate 可模拟慢速或不稳定的数据源
+
+用法:
+  python kline_benchmark.py --concurrency 1,4,16 --requests 200
+  python kline_benchmark.py --sources sina,eastmoney --latency-ms 30 --error-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+from http_transport import HttpTransport
+from kline_data_fetcher import KlineDataFetcher
+
+# 各数据源的主机与接口路径
+SOURCES = {
+    'sina': ('money.finance.sina.com.cn', '/quotes_service/api/json_v2.php/CN_MarketData.getKLineData'),
+    'eastmoney': ('push2his.eastmoney.com', '/api/qt/stock/kline/get'),
+    'yahoo': ('query1.finance.yahoo.com', '/v8/finance/chart/'),
+}
+
+TEST_STOCKS = ['sz000498', 'sh000001', 'sz399001', 'sh600000', 'sz000001']
+
+
+def build_fixtures(days=250, seed=0):
+    """生成三个数据源格式的日K线响应，返回 {数据源: 响应字节}"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    close = 10 + np.cumsum(rng.normal(0, 0.1, days))
+    open_ = close + rng.normal(0, 0.05, days)
+    high = np.maximum(open_, close) + rng.uniform(0, 0.1, days)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.1, days)
+    volume = rng.integers(10000, 1000000, days)
+
+    sina = [{'day': d.strftime('%Y-%m-%d'), 'open': f'{o:.2f}', 'high': f'{h:.2f}', 'low': f'{l:.2f}',
+             'close': f'{c:.2f}', 'volume': str(v)}
+            for d, o, h, l, c, v in zip(dates, open_, high, low, close, volume)]
+
+    klines = [f"{d.strftime('%Y-%m-%d')},{o:.2f},{c:.2f},{h:.2f},{l:.2f},{v},{v * c * 100:.1f},1.00,0.50,0.05,0.80"
+              for d, o, h, l, c, v in zip(dates, open_, high, low, close, volume)]
+    eastmoney = {'rc': 0, 'data': {'klines': klines}}
+
+    timestamps = ((dates + pd.Timedelta(hours=1, minutes=30)).astype('int64') // 10 ** 9).tolist()
+    yahoo = {'chart': {'result': [{
+        'timestamp': timestamps,
+        'indicators': {'quote': [{
+            'open': np.round(open_, 2).tolist(),
+            'high': np.round(high, 2).tolist(),
+            'low': np.round(low, 2).tolist(),
+            'close': np.round(close, 2).tolist(),
+            'volume': volume.tolist(),
+        }]}
+    }]}}
+
+    return {name: json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            for name, payload in (('sina', sina), ('eastmoney', eastmoney), ('yahoo', yahoo))}
+
+
+class StubServer:
+    """本地模拟数据源服务器，按请求路径返回对应数据源的固定响应"""
+
+    def __init__(self, fixtures, latency_ms=0.0, error_rate=0.0, seed=0):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.bytes_sent = {name: 0 for name in SOURCES}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 响应头和响应体分两次写出，关闭Nagle算法避免延迟确认带来的约40ms额外延迟
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                source = server.match_source(self.path)
+                with server._lock:
+                    failed = server._random.random() < server.error_rate
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+
+                if source is None or failed:
+                    status, body = (404 if source is None else 500), b'{}'
+                else:
+                    status, body = 200, server.fixtures[source]
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                if source is not None:
+                    with server._lock:
+                        server.bytes_sent[source] += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @staticmethod
+    def match_source(path):
+        for name, (_, prefix) in SOURCES.items():
+            if path.startswith(prefix):
+                return name
+        return None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def reset_bytes(self):
+        with self._lock:
+            self.bytes_sent = {name: 0 for name in SOURCES}
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run_level(func, concurrency, total_requests, days):
+    """以指定并发数调用 func，返回每次调用的 (延迟秒, 是否成功) 以及总耗时"""
+    codes = [TEST_STOCKS[i % len(TEST_STOCKS)] for i in range(total_requests)]
+
+    def call(code):
+        start = time.perf_counter()
+        try:
+            df = func(code, days)
+            ok = df is not None and not df.empty
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, codes))
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed, bytes_sent):
+    latencies = np.array([r[0] for r in results]) * 1000
+    errors = sum(1 for r in results if not r[1])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'rps': len(results) / elapsed,
+        'error_rate': errors / len(results),
+        'bytes': bytes_sent,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='K线数据源并发性能基准测试（离线）')
+    parser.add_argument('--sources', default='sina,eastmoney,yahoo', help='逗号分隔的数据源')
+    parser.add_argument('--concurrency', default='1,4,16', help='逗号分隔的并发数')
+    parser.add_argument('--requests', type=int, default=200, help='每个并发级别的请求数')
+    parser.add_argument('--days', type=int, default=90, help='每次请求的K线天数')
+    parser.add_argument('--fixture-days', type=int, default=250, help='模拟响应中的K线条数')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='模拟服务器的响应延迟')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟服务器返回500的概率')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sources = [s for s in args.sources.split(',') if s]
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+
+    server = StubServer(build_fixtures(args.fixture_days, args.seed), args.latency_ms,
+                        args.error_rate, args.seed).start()
+    # 不重试、不限速，使结果反映模拟服务器的实际延迟和失败
+    transport = HttpTransport(pool_maxsize=max(levels), max_retries=0, enable_rate_limit=False,
+                              host_overrides={host: server.base_url for host, _ in SOURCES.values()})
+    fetcher = KlineDataFetcher(transport=transport)
+    source_funcs = {
+        'sina': fetcher.get_sina_kline_data,
+        'eastmoney': fetcher.get_eastmoney_kline_data,
+        'yahoo': fetcher.get_yahoo_kline_data,
+    }
+
+    print("🚀 K线数据源并发性能基准测试（本地模拟服务器）")
+    print(f"模拟服务器: {server.base_url}  延迟: {args.latency_ms}ms  错误率: {args.error_rate:.0%}")
+    print(f"每级请求数: {args.requests}  K线天数: {args.days}")
+    print("=" * 90)
+    print(f"{'数据源':<12}{'并发':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+          f"{'请求/秒':>10}{'错误率':>9}{'传输(KB)':>12}")
+    print("-" * 90)
+
+    try:
+        for source in sources:
+            func = source_funcs[source]
+            run_level(func, 1, len(TEST_STOCKS), args.days)  # 预热连接池
+            for concurrency in levels:
+                server.reset_bytes()
+                results, elapsed = run_level(func, concurrency, args.requests, args.days)
+                stats = summarize(results, elapsed, server.bytes_sent[source])
+                print(f"{source:<12}{concurrency:>6}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+                      f"{stats['p99_ms']:>10.1f}{stats['rps']:>10.1f}{stats['error_rate']:>9.1%}"
+                      f"{stats['bytes'] / 1024:>12.1f}")
+    finally:
+        transport.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
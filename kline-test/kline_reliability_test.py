@@ -76,9 +76,6 @@ def test_single_data_source(fetcher, data_source_name, data_source_func, stock_c
 
         results[stock_code] = result
 
-        # 避免请求过于频繁
-        time.sleep(1)
-
     return results
 
 
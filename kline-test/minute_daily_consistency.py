@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分钟K线合成日K线一致性检查
+获取最近几天的1分钟K线并缓存到本地仓库，再与数据源日K线逐日比较
+同一数据源的分钟与日K线成交量单位一致，因此两者使用相同的数据源
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+from http_transport import HttpTransport
+from kline_store import KlineStore
+from kline_data_fetcher import KlineDataFetcher
+from realtime_data_fetcher import RealtimeDataFetcher
+
+
+def main():
+    stock_codes = ['sz000498', 'sh600000']
+    data_source = 'eastmoney'
+
+    root_dir = tempfile.mkdtemp(prefix='minute_daily_')
+    minute_store = KlineStore(root_dir, time_column='时间', dataset='1min')
+    transport = HttpTransport()
+    realtime_fetcher = RealtimeDataFetcher(transport=transport, minute_store=minute_store)
+    kline_fetcher = KlineDataFetcher(transport=transport, minute_store=minute_store)
+
+    print("🚀 分钟K线合成日K线一致性检查")
+    print(f"📁 临时仓库: {root_dir}")
+    print("=" * 60)
+
+    for stock_code in stock_codes:
+        realtime_fetcher.get_minute_data(stock_code, days=4, data_source=data_source)
+        report = kline_fetcher.check_minute_synthesis(stock_code, data_source)
+        if report is not None:
+            print(report.to_string(index=False))
+        print("-" * 60)
+
+    transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+录制与回放K线数据源响应
+  record: 请求各数据源并把原始响应保存到录制目录（默认访问真实数据源，
+          --stub 时从本地模拟服务器录制，便于离线生成录制数据）
+  bench:  不访问网络，用录制的响应反复调用获取器，测量解析与处理流程的吞吐量
+
+用法:
+  python replay_fixtures.py record --dir fixtures
+  python replay_fixtures.py bench --dir fixtures --repeat 50 --latency-ms 5 --jitter-ms 2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+from http_transport import HttpTransport
+from kline_data_fetcher import KlineDataFetcher
+from replay_transport import ReplayTransport
+from kline_benchmark import SOURCES, TEST_STOCKS, StubServer, build_fixtures
+
+
+def source_funcs(fetcher):
+    return {
+        'sina': fetcher.get_sina_kline_data,
+        'eastmoney': fetcher.get_eastmoney_kline_data,
+        'yahoo': fetcher.get_yahoo_kline_data,
+    }
+
+
+def record(args):
+    server = None
+    transport = None
+    if args.stub:
+        server = StubServer(build_fixtures()).start()
+        transport = HttpTransport(host_overrides={host: server.base_url for host, _ in SOURCES.values()})
+
+    with ReplayTransport(args.dir, mode='record', transport=transport) as recorder:
+        fetcher = KlineDataFetcher(transport=recorder)
+        for source, func in source_funcs(fetcher).items():
+            for stock_code in TEST_STOCKS:
+                df = func(stock_code, args.days)
+                status = f"{len(df)} 条" if df is not None and not df.empty else "失败"
+                print(f"📼 {source:<10} {stock_code}: {status}")
+        print(f"\n✅ 已录制 {len(recorder.index)} 个请求到: {args.dir}")
+
+    if server is not None:
+        server.stop()
+
+
+def bench(args):
+    transport = ReplayTransport(args.dir, mode='replay', latency_ms=args.latency_ms,
+                                jitter_ms=args.jitter_ms, seed=0)
+    fetcher = KlineDataFetcher(transport=transport)
+
+    print("🚀 回放录制数据的获取器吞吐量")
+    print(f"录制目录: {args.dir}  模拟延迟: {args.latency_ms}±{args.jitter_ms}ms  重复次数: {args.repeat}")
+    print("=" * 70)
+    print(f"{'数据源':<12}{'调用次数':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'调用/秒':>12}{'MB/秒':>10}")
+    print("-" * 70)
+
+    for source, func in source_funcs(fetcher).items():
+        latencies = []
+        failures = 0
+        bytes_before = transport.bytes_served
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for stock_code in TEST_STOCKS:
+                t0 = time.perf_counter()
+                df = func(stock_code, args.days)
+                latencies.append(time.perf_counter() - t0)
+                if df is None or df.empty:
+                    failures += 1
+        elapsed = time.perf_counter() - start
+        if failures == len(latencies):
+            print(f"{source:<12}{'没有可用的录制数据':>20}")
+            continue
+
+        p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+        megabytes = (transport.bytes_served - bytes_before) / 1024 / 1024
+        print(f"{source:<12}{len(latencies):>10}{p50:>10.2f}{p99:>10.2f}"
+              f"{len(latencies) / elapsed:>12.1f}{megabytes / elapsed:>10.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='录制与回放K线数据源响应')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='录制数据源响应')
+    record_parser.add_argument('--stub', action='store_true', help='从本地模拟服务器录制')
+
+    bench_parser = subparsers.add_parser('bench', help='回放录制数据测量吞吐量')
+    bench_parser.add_argument('--repeat', type=int, default=20, help='每只股票的调用轮数')
+    bench_parser.add_argument('--latency-ms', type=float, default=0.0, help='模拟延迟')
+    bench_parser.add_argument('--jitter-ms', type=float, default=0.0, help='模拟延迟的抖动范围')
+
+    for sub in (record_parser, bench_parser):
+        sub.add_argument('--dir', default=os.path.join(os.path.dirname(__file__), 'fixtures'),
+                         help='录制数据目录')
+        sub.add_argument('--days', type=int, default=90, help='K线天数')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'record':
+        record(args)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -39,22 +39,22 @@ def main():
     print("\n" + "=" * 60)
 
     # 示例2: 获取不同周期的数据
-    print("📈 示例2: 获取不同周期的分时数据")
+    print("📈 示例2: 获取不同周期的分时数据（请求一次1分钟数据，本地合成其他周期）")
     print("=" * 60)
 
     periods = [1, 5, 15, 30, 60]
+    multi = fetcher.get_minute_data_multi(stock_code, periods, 'auto')
 
     for p in periods:
-        print(f"\n⏱️  获取 {p} 分钟数据...")
-        df_p = fetcher.get_minute_data(stock_code, p, 'auto')
+        df_p = multi.get(p) if multi else None
 
         if df_p is not None and not df_p.empty:
-            print(f"✅ 成功获取 {len(df_p)} 条 {p} 分钟数据")
+            print(f"\n✅ {p} 分钟数据 {len(df_p)} 条")
             latest = df_p.iloc[-1]
             print(f"   最新时间: {latest['时间']}")
             print(f"   最新价格: {latest['收盘价']:.2f}")
         else:
-            print(f"❌ 获取 {p} 分钟数据失败")
+            print(f"\n❌ 获取 {p} 分钟数据失败")
 
     print("\n" + "=" * 60)
 